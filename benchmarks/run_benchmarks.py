@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks of the game engine and of the board construction.
+
+Each benchmark is run on several configurations and reports the best time per
+operation over a few repeats. Results are written as JSON, along with the
+commit they were measured on, and can be compared with a previous run:
+
+    python benchmarks/run_benchmarks.py --output new.json --compare old.json
+"""
+
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Allow running the script from any directory
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from mastermind import solver
+from mastermind.mastermind_core import MastermindCore
+from mastermind.simulation import parse_config
+from mastermind.simulation import play_chunk
+
+
+# Configurations given as LENGTHxCOLOURS, the first ones being used in quick mode
+CONFIGS = ['4x6', '4x7', '5x8', '6x10']
+QUICK_CONFIGS = CONFIGS[:2]
+
+
+def measure(func, number, repeat=5):
+    """ Time func() called number times, repeat times. Return the best and
+        the mean time per call.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+
+    return {'best': min(timings), 'mean': sum(timings) / len(timings),
+            'ops_per_second': 1 / min(timings)}
+
+
+def new_core(description):
+    core = MastermindCore(quiet=True, seed=0)
+    core.configure(**parse_config(description, max_tries=10))
+    core.reset_game()
+    return core
+
+
+def bench_add_guess(description):
+    core = new_core(description)
+    guesses = [core.codec.decode(int(x)) for x in core.generate_secret_codes(core.max_tries - 1)]
+
+    def play_guesses():
+        core.reset_game()
+        for guess in guesses:
+            core.add_guess(guess)
+
+    result = measure(play_guesses, number=200)
+    # Report the time of a single guess
+    for key in ('best', 'mean'):
+        result[key] /= len(guesses)
+    result['ops_per_second'] = 1 / result['best']
+    return result
+
+
+def bench_reset_game(description):
+    core = new_core(description)
+    return measure(core.reset_game, number=10000)
+
+
+def bench_generate_secret_codes(description):
+    core = new_core(description)
+    result = measure(lambda: core.generate_secret_codes(100000), number=1)
+    result['ops_per_second'] = 100000 / result['best']
+    return result
+
+
+def bench_random_games(description):
+    config = parse_config(description, max_tries=10)
+    result = measure(lambda: play_chunk(config, 'random', 'bench', 200), number=1, repeat=3)
+    result['ops_per_second'] = 200 / result['best']
+    return result
+
+
+def bench_solver_games(description):
+    config = parse_config(description, max_tries=10)
+    # Warm the first guess cache so only the game play is measured
+    play_chunk(config, 'minimax', 'bench', 1)
+    result = measure(lambda: play_chunk(config, 'minimax', 'bench', 20), number=1, repeat=3)
+    result['ops_per_second'] = 20 / result['best']
+    return result
+
+
+def bench_solver_first_guess(description):
+    core = new_core(description)
+    engine = solver.Solver(core)
+
+    def first_guess():
+        solver._first_guesses.clear()
+        engine.next_guess()
+
+    return measure(first_guess, number=1, repeat=3)
+
+
+def new_board(description):
+    """ Build the board widgets without showing the application window
+    """
+    # The application loads its resources relatively to the repository
+    os.chdir(ROOT_DIR)
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    from kivy.base import EventLoop
+    from kivy.lang import Builder
+    from mastermind import kivy_app
+
+    EventLoop.ensure_window()
+    kv_file = os.path.join(os.path.dirname(kivy_app.__file__), 'mastermind.kv')
+    if kv_file not in Builder.files:
+        Builder.load_file(kv_file)
+
+    board = kivy_app.MastermindBoard()
+    board.add_logic_manager(new_core(description))
+    board.init_game()
+    return board
+
+
+def bench_draw_main_board(description):
+    board = new_board(description)
+
+    def draw():
+        board.ids.player_board.clear_widgets()
+        board.widgets = {}
+        board.draw_main_board()
+
+    return measure(draw, number=5, repeat=3)
+
+
+def bench_play_again(description):
+    """ Start a new game on an existing board, as done by "Play again"
+    """
+    board = new_board(description)
+    return measure(board.init_game, number=20, repeat=3)
+
+
+BENCHMARKS = {
+    'add_guess': (bench_add_guess, CONFIGS),
+    'reset_game': (bench_reset_game, CONFIGS),
+    'generate_secret_codes': (bench_generate_secret_codes, CONFIGS),
+    'random_games': (bench_random_games, CONFIGS),
+    'solver_games': (bench_solver_games, CONFIGS[:2]),
+    'solver_first_guess': (bench_solver_first_guess, CONFIGS),
+    'draw_main_board': (bench_draw_main_board, CONFIGS),
+    'play_again': (bench_play_again, CONFIGS),
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, quick=False):
+    results = {}
+    for name in names:
+        bench, configs = BENCHMARKS[name]
+        for description in configs:
+            if quick and description not in QUICK_CONFIGS:
+                continue
+
+            key = f"{name}[{description}]"
+            try:
+                results[key] = bench(description)
+                print(f"{key:32} {results[key]['best'] * 1e6:14.2f} us  {results[key]['ops_per_second']:14.1f} ops/s")
+            except ImportError as error:
+                # The board benchmarks require Kivy
+                print(f"{key:32} skipped: {error}")
+    return results
+
+
+def compare(results, previous):
+    """ Print the ratio between the new and the previous timings
+    """
+    print("\nComparison with the previous run (new / old, lower is faster):")
+    for key, result in results.items():
+        if key in previous['results']:
+            ratio = result['best'] / previous['results'][key]['best']
+            print(f"{key:32} {ratio:8.3f}")
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Mastermind engine.")
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"Benchmarks to run among: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file for the results")
+    parser.add_argument('--compare', help="JSON file of a previous run to compare with")
+    parser.add_argument('--quick', action='store_true', help="Only run the smallest configurations")
+    options = parser.parse_args(args)
+
+    unknown = [x for x in options.benchmarks if x not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    # The board benchmarks change the working directory
+    output_path = os.path.abspath(options.output)
+    compare_path = os.path.abspath(options.compare) if options.compare else None
+
+    results = run(options.benchmarks or list(BENCHMARKS), options.quick)
+    report = {'commit': git_commit(),
+              'python': platform.python_version(),
+              'platform': platform.platform(),
+              'timestamp': time.time(),
+              'results': results}
+
+    with open(output_path, 'w') as output:
+        json.dump(report, output, indent=2)
+
+    if compare_path:
+        with open(compare_path) as previous:
+            compare(results, json.load(previous))
+
+
+if __name__ == '__main__':
+    main()
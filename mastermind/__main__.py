@@ -0,0 +1,4 @@
+from mastermind.cli import main
+
+
+main()
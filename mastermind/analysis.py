@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+"""
+Background analysis of the games played in a user interface.
+
+The hints of a state (number of codes left and suggested guess, see
+mastermind.hints) can take a noticeable time on large configurations.
+GameAnalyser computes them in a worker thread, on a snapshot of the game, and
+hands the results to a callback through a scheduler, such as Kivy's Clock, so
+that the interface stays responsive. Submitting a new state, or cancelling,
+stops the search of the analysis in progress, and its result is never
+delivered.
+"""
+
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+
+from mastermind import hints
+from mastermind.mastermind_core import MastermindCore
+from mastermind.solver import SearchCancelledError
+
+
+logger = logging.getLogger(__name__)
+
+Analysis = namedtuple('Analysis', ['nb_guesses', 'nb_candidates', 'suggestion'])
+
+
+def snapshot(core):
+    """ Return a copy of the state of a game, unaffected by the next moves of
+        the player
+    """
+    config = core.config
+    state = MastermindCore(quiet=True)
+    state.configure(config.code_length, config.allow_duplicates, config.max_tries, config.colours)
+    state.reset_game(core.packed_secret)
+    for row in core.history:
+        state.history.append(*row)
+    return state
+
+
+def analyse(core, strategy='minimax', cancel_event=None):
+    """ Return the Analysis of the current state of a game. Setting the
+        optional threading.Event stops it with a SearchCancelledError.
+    """
+    nb_candidates = hints.remaining_candidates_count(core, cancel_event)
+    suggestion = None
+    if nb_candidates:
+        suggestion = core.codec.decode(hints.suggest_guess(core, strategy, cancel_event))
+    return Analysis(len(core.history), nb_candidates, suggestion)
+
+
+def run_now(function):
+    """ Default scheduler, calling the function from the worker thread
+    """
+    function()
+
+
+class GameAnalyser:
+    """ Analyse the states of a game one at a time in a worker thread
+    """
+
+    def __init__(self, strategy='minimax', schedule=run_now):
+        self.strategy = strategy
+        # Called with a function taking no argument, to run it on the thread
+        # expecting the results
+        self._schedule = schedule
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='analysis')
+        self._lock = threading.Lock()
+        # Bumped by each submission or cancellation, an analysis is only
+        # delivered while its generation is the current one
+        self._generation = 0
+        self._future = None
+        # Set to stop the search of the current analysis
+        self._cancel_event = threading.Event()
+
+
+    def submit(self, core, callback):
+        """ Analyse the current state of a game in the background, cancelling
+            the previous analysis. The callback is called with the Analysis
+            through the scheduler, unless cancelled in the meantime. Return the
+            future of the analysis.
+        """
+        state = snapshot(core)
+        with self._lock:
+            self._cancel()
+            self._cancel_event = threading.Event()
+            self._future = self._executor.submit(self._run, state, self._generation, self._cancel_event, callback)
+            return self._future
+
+
+    def cancel(self):
+        """ Drop the pending analysis
+        """
+        with self._lock:
+            self._cancel()
+            self._future = None
+
+
+    def _cancel(self):
+        self._generation += 1
+        self._cancel_event.set()
+        if self._future is not None:
+            self._future.cancel()
+
+
+    def _run(self, state, generation, cancel_event, callback):
+        if generation != self._generation:
+            return None
+
+        try:
+            analysis = analyse(state, self.strategy, cancel_event)
+        except SearchCancelledError:
+            return None
+        except Exception:
+            logger.exception("Failed to analyse the game")
+            raise
+
+        if generation == self._generation:
+            self._schedule(lambda: self._deliver(generation, callback, analysis))
+        return analysis
+
+
+    def _deliver(self, generation, callback, analysis):
+        # Checked again, as the player may have moved on while the delivery
+        # was scheduled
+        if generation == self._generation:
+            callback(analysis)
+
+
+    def close(self):
+        """ Cancel the pending analysis and stop the worker thread
+        """
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
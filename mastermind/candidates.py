@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+
+"""
+Lazy enumeration of the codes consistent with the guesses of a game.
+
+Codes are built peg by peg in lexicographic order, which is also the order of
+their packed values. For each guess, the pegs already placed give the number
+of pegs at the correct position and the number of matching colours so far.
+Each added peg can raise both numbers by one at most, so a prefix is dropped,
+along with all the codes starting with it, as soon as one of them exceeds the
+feedback of a guess or can no longer reach it with the pegs left.
+
+Only the current prefix is kept in memory, so the first consistent codes are
+found without listing the code space, however large it is. consistent_blocks()
+stops the search a few pegs before the end, and checks all the codes completing
+each prefix at once with NumPy, which is much faster to go through many codes.
+Codes can also be drawn at random among the consistent ones, when there are
+too many of them to go through.
+"""
+
+
+from itertools import islice
+
+from mastermind.score_table import code_digits
+from mastermind.score_table import colour_counts
+from mastermind.score_table import score_digits
+
+import numpy as np
+
+
+# Largest number of codes completing a prefix that are checked at once
+BLOCK_CODES = 1 << 16
+
+# Number of random codes checked at once when sampling
+SAMPLE_BATCH = 1 << 16
+
+# Packed codes above this value do not fit into NumPy integers
+MAX_ARRAY_CODE = np.iinfo(np.int64).max
+
+
+def _consistent_prefixes(codec, history, allow_duplicates, length):
+    """ Yield the prefixes of the given number of pegs of the codes consistent
+        with the history, in increasing order. The yielded list of colour
+        indices is reused for the next prefix.
+    """
+    code_length = codec.code_length
+    nb_colours = codec.nb_colours
+    rows = list(history)
+
+    guesses = [codec.digits(int(guess)) for guess, _, _ in rows]
+    # Pegs expected at the correct position, and colours matching at any position
+    expected_places = [places for _, places, _ in rows]
+    expected_matches = [places + colours for _, places, colours in rows]
+    guess_counts = []
+    for digits in guesses:
+        counts = [0] * nb_colours
+        for digit in digits:
+            counts[digit] += 1
+        guess_counts.append(counts)
+
+    nb_guesses = len(rows)
+    places = [0] * nb_guesses
+    matches = [0] * nb_guesses
+    code_counts = [0] * nb_colours
+    code = [0] * length
+
+    def extend(pos):
+        if pos == length:
+            yield code
+            return
+
+        pegs_left = code_length - pos - 1
+        for colour in range(nb_colours):
+            if not allow_duplicates and code_counts[colour]:
+                continue
+
+            # Place the peg, checking the feedback of every guess
+            consistent = True
+            placed = 0
+            for index in range(nb_guesses):
+                places[index] += guesses[index][pos] == colour
+                matches[index] += code_counts[colour] < guess_counts[index][colour]
+                placed += 1
+                if (places[index] > expected_places[index]
+                        or places[index] + pegs_left < expected_places[index]
+                        or matches[index] > expected_matches[index]
+                        or matches[index] + pegs_left < expected_matches[index]):
+                    consistent = False
+                    break
+
+            code_counts[colour] += 1
+            if consistent:
+                code[pos] = colour
+                yield from extend(pos + 1)
+            code_counts[colour] -= 1
+
+            # Remove the peg from the guesses it was checked against
+            for index in range(placed):
+                places[index] -= guesses[index][pos] == colour
+                matches[index] -= code_counts[colour] < guess_counts[index][colour]
+
+    return extend(0)
+
+
+def consistent_codes(codec, history, allow_duplicates=True):
+    """ Yield the packed codes consistent with the (packed guess, matching
+        places, matching colours) rows of a history, in increasing order.
+    """
+    for code in _consistent_prefixes(codec, history, allow_duplicates, codec.code_length):
+        yield codec.pack_digits(code)
+
+
+def _history_arrays(codec, history):
+    """ Return the colour indices and counts of the guesses of a history, and
+        their expected feedback, as arrays
+    """
+    rows = list(history)
+    guesses = code_digits(codec, [guess for guess, _, _ in rows])
+    places = np.array([places for _, places, _ in rows], dtype=np.uint8)
+    colours = np.array([colours for _, _, colours in rows], dtype=np.uint8)
+    return guesses, colour_counts(guesses, codec.nb_colours), places, colours
+
+
+def _consistent_digits(digits, nb_colours, history_arrays):
+    """ Tell which codes, given as colour indices, are consistent with the
+        history
+    """
+    guesses, guesses_counts, expected_places, expected_colours = history_arrays
+    if len(guesses) == 0:
+        return np.ones(len(digits), dtype=bool)
+
+    places, colours = score_digits(guesses, digits, nb_colours, guesses_counts=guesses_counts)
+    return ((places == expected_places[:, None]) & (colours == expected_colours[:, None])).all(axis=0)
+
+
+def consistent_mask(codec, history, codes):
+    """ Tell which codes of an array of packed codes are consistent with the
+        history
+    """
+    return _consistent_digits(code_digits(codec, codes), codec.nb_colours, _history_arrays(codec, history))
+
+
+def consistent_blocks(codec, history, allow_duplicates=True, block_codes=BLOCK_CODES):
+    """ Yield arrays of the packed codes consistent with the history, in
+        increasing order. Each array holds the consistent codes completing a
+        prefix kept by the search, of up to block_codes codes.
+    """
+    nb_colours = codec.nb_colours
+    code_length = codec.code_length
+    guesses, guesses_counts, expected_places, expected_colours = _history_arrays(codec, history)
+    # Signed, as the pegs left to find are differences
+    guesses_counts = guesses_counts.astype(np.int64)
+    expected_places = expected_places.astype(np.int64)
+    expected_matches = expected_places + expected_colours
+
+    suffix_length = 0
+    while suffix_length < code_length and nb_colours ** (suffix_length + 1) <= block_codes:
+        suffix_length += 1
+    prefix_length = code_length - suffix_length
+
+    # Every combination of the last pegs, with their packed value
+    suffix_size = nb_colours ** suffix_length
+    suffixes = np.arange(suffix_size, dtype=np.int64)
+    suffix_digits = np.indices((nb_colours,) * suffix_length, dtype=np.uint8).reshape(suffix_length, suffix_size).T
+    if not allow_duplicates:
+        sorted_digits = np.sort(suffix_digits, axis=1)
+        distinct = (sorted_digits[:, 1:] != sorted_digits[:, :-1]).all(axis=1)
+        suffixes, suffix_digits = suffixes[distinct], suffix_digits[distinct]
+        # Suffixes using each colour, to drop the ones repeating the prefix's
+        uses_colour = [(suffix_digits == x).any(axis=1) for x in range(nb_colours)]
+
+    # Share of the suffixes in the feedback of each guess: the pegs at the
+    # correct position, and the colour counts
+    suffix_places = (guesses[:, None, prefix_length:] == suffix_digits[None, :, :]).sum(axis=2, dtype=np.int64)
+    suffix_counts = colour_counts(suffix_digits, nb_colours)
+
+    # The places of the first guesses are combined into a single key, the
+    # suffixes being sorted by key so that the ones giving the expected places
+    # with a prefix are found by a binary search
+    nb_keyed = 0
+    while nb_keyed < len(guesses) and (code_length + 1) ** (nb_keyed + 1) <= MAX_ARRAY_CODE:
+        nb_keyed += 1
+    key_weights = (code_length + 1) ** np.arange(nb_keyed, dtype=np.int64)
+    suffix_keys = key_weights @ suffix_places[:nb_keyed]
+    order = np.argsort(suffix_keys, kind='stable')
+    suffix_keys = suffix_keys[order]
+
+    # Colour matches of the suffixes with the pegs of each guess left
+    # unmatched by a prefix, keyed by these pegs counts
+    residual_matches = [{} for _ in guesses]
+    prefix_counts = np.zeros(nb_colours, dtype=np.int64)
+    for prefix in _consistent_prefixes(codec, history, allow_duplicates, prefix_length):
+        prefix_places = (guesses[:, :prefix_length] == np.array(prefix, dtype=np.uint8)).sum(axis=1)
+        places_left = expected_places - prefix_places
+        key = int(key_weights @ places_left[:nb_keyed])
+        kept = order[np.searchsorted(suffix_keys, key, 'left'):np.searchsorted(suffix_keys, key, 'right')]
+        if len(kept) == 0:
+            continue
+
+        kept = np.sort(kept)
+        for index in range(nb_keyed, len(guesses)):
+            kept = kept[suffix_places[index, kept] == places_left[index]]
+        if not allow_duplicates:
+            for colour in prefix:
+                kept = kept[~uses_colour[colour][kept]]
+
+        if len(guesses) > 0 and len(kept) > 0:
+            prefix_counts[:] = 0
+            for colour in prefix:
+                prefix_counts[colour] += 1
+            common = np.minimum(guesses_counts, prefix_counts)
+            prefix_matches = common.sum(axis=1)
+            residuals = guesses_counts - common
+            for index, residual in enumerate(residuals):
+                matches = _residual_matches(residual_matches[index], residual, suffix_counts)
+                kept = kept[matches[kept] == expected_matches[index] - prefix_matches[index]]
+                if len(kept) == 0:
+                    break
+
+        if len(kept) > 0:
+            yield codec.pack_digits(prefix) * suffix_size + suffixes[kept]
+
+
+def _residual_matches(cache, residual, suffix_counts):
+    """ Return the colour matches of every suffix with the residual pegs
+        counts of a guess, computed once per residual
+    """
+    key = residual.tobytes()
+    matches = cache.get(key)
+    if matches is None:
+        matches = cache[key] = np.minimum(residual, suffix_counts).sum(axis=1)
+    return matches
+
+
+def random_codes(codec, allow_duplicates, count, generator):
+    """ Draw packed codes uniformly from a configuration, as an array. The
+        codes too large for NumPy integers are Python ints in an object array.
+    """
+    fits_array = codec.size - 1 <= MAX_ARRAY_CODE
+    if allow_duplicates:
+        if fits_array:
+            return generator.integers(0, codec.size, size=count, dtype=np.int64)
+        digits = generator.integers(0, codec.nb_colours, size=(count, codec.code_length))
+    else:
+        # Keep the first colours of random permutations of the colours set
+        colours = np.argsort(generator.random((count, codec.nb_colours)), axis=1)
+        digits = colours[:, :codec.code_length]
+    return digits @ np.array(codec.weights, dtype=np.int64 if fits_array else object)
+
+
+def sample_consistent_codes(codec, history, allow_duplicates=True, size=4096, generator=None,
+                            max_draws=1 << 22):
+    """ Draw up to size distinct codes uniformly among the codes consistent
+        with the history, by keeping the consistent ones among random codes.
+        Return them as a sorted array, which is shorter than size when too few
+        are found within max_draws random codes.
+    """
+    generator = generator if generator is not None else np.random.default_rng()
+    history_arrays = _history_arrays(codec, history)
+
+    found = []
+    nb_found = 0
+    for _ in range(0, max_draws, SAMPLE_BATCH):
+        codes = random_codes(codec, allow_duplicates, SAMPLE_BATCH, generator)
+        codes = codes[_consistent_digits(code_digits(codec, codes), codec.nb_colours, history_arrays)]
+        found.append(codes)
+        nb_found += len(codes)
+        if nb_found >= size:
+            break
+
+    # The codes are in random order until they are sorted
+    return np.unique(np.concatenate(found)[:size])
+
+
+def find_consistent_code(codec, history, allow_duplicates=True):
+    """ Return the lowest packed code consistent with the history, or None
+    """
+    return next(consistent_codes(codec, history, allow_duplicates), None)
+
+
+def count_consistent_codes(codec, history, allow_duplicates=True, limit=None):
+    """ Count the codes consistent with the history, stopping at limit
+    """
+    if codec.size - 1 > MAX_ARRAY_CODE:
+        return sum(1 for _ in islice(consistent_codes(codec, history, allow_duplicates), limit))
+
+    count = 0
+    for codes in consistent_blocks(codec, history, allow_duplicates):
+        count += len(codes)
+        if limit is not None and count >= limit:
+            return limit
+    return count
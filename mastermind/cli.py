@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+"""
+Terminal front-end of the game, usable without Kivy.
+
+Interactive mode plays a game in the terminal: guesses are typed as colour
+names (or unambiguous prefixes of them) separated by spaces or commas.
+
+Batch mode, used when files are given or stdin is not a terminal, reads lines
+from files or stdin and writes one line of feedback per guess to stdout:
+
+ - "secret <colours>" starts a new game with the given secret code,
+ - "new" starts a new game with a random secret code,
+ - any other line is a guess, answered with "<places> <colours> <state>",
+   the state being one of: playing, won, lost,
+ - blank lines and lines starting with '#' are ignored.
+
+Invalid lines are answered with "error <type>: <message>".
+"""
+
+
+import argparse
+import sys
+
+from mastermind.mastermind_core import BadColoursSetError
+from mastermind.mastermind_core import BadGuessLengthError
+from mastermind.mastermind_core import MastermindCore
+from mastermind.mastermind_core import MaxTriesReachedError
+from mastermind.mastermind_core import UnknownColourError
+
+
+DEFAULT_COLOURS = 'Green,Yellow,Red,Orange,Blue,Black,White'
+
+
+class GameOverError(Exception):
+    pass
+
+
+def split_code(line):
+    return line.replace(',', ' ').split()
+
+
+def match_colours(words, colours):
+    """ Translate colour names, or unambiguous prefixes of them, into the
+        colours of the set, ignoring the case.
+    """
+    code = []
+    for word in words:
+        matches = [x for x in colours if x.lower() == word.lower()]
+        if not matches:
+            matches = [x for x in colours if x.lower().startswith(word.lower())]
+        # Keep ambiguous and unknown words as is, so the core reports them
+        code.append(matches[0] if len(matches) == 1 else word)
+    return code
+
+
+class BatchPlayer:
+    """ Play the games described by batch lines
+    """
+
+    def __init__(self, core):
+        self._core = core
+        self._game_over = False
+
+
+    def process_line(self, line):
+        """ Process a line and return the feedback line, or None for lines
+            that do not need one.
+        """
+        line = line.strip()
+        if not line or line.startswith('#'):
+            return None
+
+        try:
+            if line == 'new':
+                self._core.reset_game()
+                self._game_over = False
+                return None
+
+            if line.startswith('secret '):
+                self._core.secret_code = split_code(line[7:])
+                self._game_over = False
+                return None
+
+            return self._guess(split_code(line))
+
+        except (BadGuessLengthError, UnknownColourError, GameOverError) as error:
+            return f"error {type(error).__name__}: {error}"
+
+
+    def _guess(self, guess):
+        if self._game_over:
+            raise GameOverError("The game is over, start a new game")
+
+        core = self._core
+        try:
+            state = 'won' if core.add_guess(guess) else 'playing'
+        except MaxTriesReachedError:
+            state = 'lost'
+
+        self._game_over = state != 'playing'
+        return f"{core.last_row_correct_positions} {core.last_row_correct_colours} {state}"
+
+
+def run_batch(core, files, output):
+    player = BatchPlayer(core)
+    write = output.write
+    for batch_file in files:
+        for line in batch_file:
+            feedback = player.process_line(line)
+            if feedback is not None:
+                write(feedback)
+                write('\n')
+
+
+def play_interactive(core, input_func=input, output=None):
+    """ Play a game in the terminal. Return True if the player has won.
+    """
+    output = output or sys.stdout
+    colours = core.codec.colours
+    print(f"Find the secret code of {core.code_length} pegs in {core.max_tries} tries.", file=output)
+    print(f"Colours: {', '.join(colours)}", file=output)
+
+    while True:
+        try:
+            line = input_func(f"Guess #{core.nb_player_guesses + 1}: ")
+        except EOFError:
+            return False
+
+        if line.strip().lower() in ('quit', 'exit'):
+            print(f"The secret code was: {' '.join(core.secret_code)}", file=output)
+            return False
+
+        try:
+            won = core.add_guess(match_colours(split_code(line), colours))
+        except (BadGuessLengthError, UnknownColourError) as error:
+            print(error, file=output)
+            continue
+        except MaxTriesReachedError:
+            print(f"Correct positions: {core.last_row_correct_positions}, "
+                  f"correct colours: {core.last_row_correct_colours}", file=output)
+            print(f"You have LOST! The secret code was: {' '.join(core.secret_code)}", file=output)
+            return False
+
+        if won:
+            print(f"You have WON in {core.nb_player_guesses} tries!", file=output)
+            return True
+
+        print(f"Correct positions: {core.last_row_correct_positions}, "
+              f"correct colours: {core.last_row_correct_colours}", file=output)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m mastermind',
+                                     description="Play Mastermind in the terminal.")
+    parser.add_argument('files', nargs='*', type=argparse.FileType('r'),
+                        help="Batch files to replay, '-' for stdin. Implies --batch.")
+    parser.add_argument('--batch', action='store_true',
+                        help="Read batch lines from stdin, the default when stdin is not a terminal")
+    parser.add_argument('--code-length', type=int, default=4)
+    parser.add_argument('--colours', default=DEFAULT_COLOURS, help="Comma separated colours set")
+    parser.add_argument('--no-duplicates', action='store_true')
+    parser.add_argument('--max-tries', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    options = parser.parse_args(args)
+
+    core = MastermindCore(quiet=True, seed=options.seed)
+    try:
+        core.configure(code_length=options.code_length,
+                       allow_duplicates=not options.no_duplicates,
+                       max_tries=options.max_tries,
+                       colours_set=[x.strip() for x in options.colours.split(',') if x.strip()])
+    except (BadColoursSetError, ValueError) as error:
+        parser.error(str(error))
+
+    if options.batch or options.files or not sys.stdin.isatty():
+        run_batch(core, options.files or [sys.stdin], sys.stdout)
+    else:
+        play_interactive(core)
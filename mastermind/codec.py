@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+"""
+Compact integer representation of the Mastermind codes.
+
+Colours are mapped to small integer indices following a canonical order, and a
+code is packed into a single int whose base-N digits are the colour indices of
+its pegs (the first peg being the most significant digit). Packed codes keep
+the lexicographic order of the pegs, and every code of a configuration lies in
+range(codec.size).
+"""
+
+
+class CodeCodec:
+    """ Translate codes between their colour names and their packed form
+    """
+
+    def __init__(self, colours, code_length):
+        # Sort the colours so the mapping does not depend on the iteration
+        # order of a set, which changes from one process to another
+        self._colours = tuple(sorted(set(colours)))
+        self._code_length = code_length
+        self._nb_colours = len(self._colours)
+        self._indices = {colour: index for index, colour in enumerate(self._colours)}
+        self._size = self._nb_colours ** code_length
+
+        # Weight of each peg position, the first peg being the most significant
+        self._weights = tuple(self._nb_colours ** (code_length - 1 - pos)
+                              for pos in range(code_length))
+
+
+    @property
+    def colours(self):
+        return self._colours
+
+
+    @property
+    def nb_colours(self):
+        return self._nb_colours
+
+
+    @property
+    def code_length(self):
+        return self._code_length
+
+
+    @property
+    def size(self):
+        return self._size
+
+
+    @property
+    def weights(self):
+        """ Weight of each peg position in a packed code
+        """
+        return self._weights
+
+
+    def colour_index(self, colour):
+        """ Return the index of a colour. Raise KeyError for unknown colours.
+        """
+        return self._indices[colour]
+
+
+    def encode(self, code):
+        """ Pack a list of colour names into an int. Raise KeyError when a
+            colour is not part of the set.
+        """
+        indices = self._indices
+        packed = 0
+        for colour in code:
+            packed = packed * self._nb_colours + indices[colour]
+        return packed
+
+
+    def decode(self, packed):
+        """ Unpack an int into a list of colour names
+        """
+        colours = self._colours
+        return [colours[digit] for digit in self.digits(packed)]
+
+
+    def digits(self, packed):
+        """ Unpack an int into the list of colour indices of its pegs
+        """
+        digits = [0] * self._code_length
+        for pos in range(self._code_length - 1, -1, -1):
+            packed, digits[pos] = divmod(packed, self._nb_colours)
+        return digits
+
+
+    def pack_digits(self, digits):
+        """ Pack a sequence of colour indices into an int
+        """
+        packed = 0
+        for digit in digits:
+            packed = packed * self._nb_colours + digit
+        return packed
+
+
+    def has_duplicates(self, packed):
+        """ Tell whether a packed code uses the same colour more than once
+        """
+        digits = self.digits(packed)
+        return len(set(digits)) != len(digits)
+
+
+    def score(self, guess_digits, secret_digits):
+        """ Compute the feedback of a guess against a secret, both given as
+            colour indices.
+
+            Return the number of pegs at the correct position and the number of
+            pegs of the correct colour at a wrong position.
+        """
+        places = 0
+        guess_counts = [0] * self._nb_colours
+        secret_counts = [0] * self._nb_colours
+        for guess_peg, secret_peg in zip(guess_digits, secret_digits):
+            if guess_peg == secret_peg:
+                places += 1
+            else:
+                guess_counts[guess_peg] += 1
+                secret_counts[secret_peg] += 1
+
+        colours = 0
+        for guess_count, secret_count in zip(guess_counts, secret_counts):
+            colours += guess_count if guess_count < secret_count else secret_count
+
+        return places, colours
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+"""
+Validated and immutable game configurations.
+
+A GameConfig holds the settings of a game along with everything derived from
+them: the codec (colour indices and code space size), a stable hash, and the
+arrays that are costly to build, attached on first use. Configurations are
+interned: GameConfig.get() returns the same object for the same settings, for
+as long as it is in use, so that configuring many games the same way only
+pays for the first one.
+"""
+
+
+import hashlib
+import math
+import weakref
+
+from mastermind.codec import CodeCodec
+from mastermind.score_table import code_digits
+from mastermind.score_table import load_score_table
+
+import numpy as np
+
+
+DEFAULT_COLOURS = ('Green', 'Yellow', 'Red', 'Orange', 'Blue', 'Black', 'White')
+
+# Upper bounds of the settings. The number of tries, the pegs counts of the
+# feedback and the number of colours are stored as single bytes by the
+# history, the journal, the exports and the opening books.
+MAX_CODE_LENGTH = 255
+MAX_TRIES = 255
+MAX_COLOURS = 255
+# Length of a colour name, in UTF-8 bytes
+MAX_COLOUR_NAME_LENGTH = 255
+
+# Configurations in use, keyed by their settings
+_configs = weakref.WeakValueDictionary()
+
+
+class BadColoursSetError(Exception):
+    pass
+
+
+def valid_codes(codec, allow_duplicates):
+    """ Return the array of all the packed codes of a configuration
+    """
+    codes = np.arange(codec.size, dtype=np.int64)
+    if allow_duplicates:
+        return codes
+
+    digits = np.sort(code_digits(codec, codes), axis=1)
+    no_duplicates = (digits[:, 1:] != digits[:, :-1]).all(axis=1)
+    return codes[no_duplicates]
+
+
+class GameConfig:
+    """ Settings of a game. Use GameConfig.get() to create them.
+    """
+
+    __slots__ = ('_key', '_hash', '_codec', '_colours_set', '_score_table', '_valid_codes', '__weakref__')
+
+    def __init__(self, code_length, allow_duplicates, max_tries, colours):
+        self._key = (code_length, allow_duplicates, max_tries, colours)
+        self._codec = CodeCodec(colours, code_length)
+        self._colours_set = frozenset(colours)
+        self._score_table = None
+        self._valid_codes = None
+
+        # Stable across processes, unlike hash() on strings
+        description = repr((code_length, max_tries, allow_duplicates, self._codec.colours))
+        self._hash = int.from_bytes(hashlib.sha1(description.encode('utf-8')).digest()[:8], 'little')
+
+
+    @classmethod
+    def get(cls, code_length=4, allow_duplicates=True, max_tries=10, colours_set=DEFAULT_COLOURS):
+        """ Validate the settings and return their configuration
+        """
+        colours = tuple(sorted(set(colours_set)))
+        key = (code_length, allow_duplicates, max_tries, colours)
+        config = _configs.get(key)
+        if config is not None:
+            return config
+
+        if not isinstance(code_length, int) or not 1 <= code_length <= MAX_CODE_LENGTH:
+            raise ValueError(f"The code length must be an integer from 1 to {MAX_CODE_LENGTH}, got: {code_length}")
+        if not isinstance(max_tries, int) or not 1 <= max_tries <= MAX_TRIES:
+            raise ValueError(f"The maximum number of tries must be an integer from 1 to {MAX_TRIES}, "
+                             f"got: {max_tries}")
+        if not colours:
+            raise BadColoursSetError("The colours set is empty.")
+        if len(colours) > MAX_COLOURS:
+            raise BadColoursSetError(f"The colours set is too large ({len(colours)}), the limit is {MAX_COLOURS}.")
+        for colour in colours:
+            if not isinstance(colour, str) or len(colour.encode('utf-8')) > MAX_COLOUR_NAME_LENGTH:
+                raise BadColoursSetError((f"Colours must be names of at most {MAX_COLOUR_NAME_LENGTH} bytes, "
+                                          f"got: {colour!r}"))
+
+        # Check out that the colours set is big enough when no duplicates are allowed
+        if not allow_duplicates and len(colours) < code_length:
+            raise BadColoursSetError((f"The colours set is too small ({len(colours)}) "
+                                      f"for the expected code length ({code_length}) "
+                                       "and no duplicates are allowed."))
+
+        config = _configs[key] = cls(code_length, bool(allow_duplicates), max_tries, colours)
+        return config
+
+
+    def __reduce__(self):
+        # Intern the configurations sent to other processes too
+        return (GameConfig.get, (self.code_length, self.allow_duplicates, self.max_tries, self.colours))
+
+
+    def __eq__(self, other):
+        return isinstance(other, GameConfig) and self._key == other._key
+
+
+    def __hash__(self):
+        return hash(self._key)
+
+
+    def __repr__(self):
+        return (f"GameConfig(code_length={self.code_length}, allow_duplicates={self.allow_duplicates}, "
+                f"max_tries={self.max_tries}, colours={self.colours})")
+
+
+    @property
+    def code_length(self):
+        return self._key[0]
+
+
+    @property
+    def allow_duplicates(self):
+        return self._key[1]
+
+
+    @property
+    def max_tries(self):
+        return self._key[2]
+
+
+    @property
+    def colours(self):
+        """ Colours in their canonical order
+        """
+        return self._codec.colours
+
+
+    @property
+    def colours_set(self):
+        return self._colours_set
+
+
+    @property
+    def codec(self):
+        return self._codec
+
+
+    @property
+    def size(self):
+        """ Number of codes, including the ones with duplicates
+        """
+        return self._codec.size
+
+
+    @property
+    def nb_valid_codes(self):
+        """ Number of codes allowed as secret codes, without listing them
+        """
+        if self.allow_duplicates:
+            return self._codec.size
+        return math.perm(self._codec.nb_colours, self.code_length)
+
+
+    @property
+    def config_hash(self):
+        """ Stable 64 bits hash of the configuration, identical across
+            processes
+        """
+        return self._hash
+
+
+    @property
+    def score_table(self):
+        """ Score table, or None until load_score_table() is called
+        """
+        return self._score_table
+
+
+    def load_score_table(self):
+        if self._score_table is None:
+            self._score_table = load_score_table(self._codec)
+        return self._score_table
+
+
+    @property
+    def valid_codes(self):
+        """ Read-only array of the packed codes allowed as secret codes
+        """
+        if self._valid_codes is None:
+            codes = valid_codes(self._codec, self.allow_duplicates)
+            codes.flags.writeable = False
+            self._valid_codes = codes
+        return self._valid_codes
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+"""
+Columnar export of the finished games, for analytics.
+
+Games are buffered in memory and written by chunks into a directory, either as
+one NumPy .npz file per chunk or, when pyarrow is installed, as one Parquet row
+group per chunk. Each game is a row with the columns:
+
+ - config_hash: stable hash of the game configuration (uint64),
+ - secret: packed secret code (uint64),
+ - tries: number of guesses played (uint8),
+ - won: whether the secret code has been found (bool),
+ - guesses, places, colours: packed guesses and their feedback, one per try.
+
+In the .npz files the per-try columns are flattened, the tries of each game
+being contiguous, and the number of tries gives the boundaries of the games.
+Parquet stores them as list columns.
+"""
+
+
+import os
+
+import numpy as np
+
+
+FORMATS = ('npz', 'parquet')
+
+GAME_COLUMNS = ('config_hash', 'secret', 'tries', 'won')
+TRY_COLUMNS = ('guesses', 'places', 'colours')
+
+COLUMN_TYPES = {'config_hash': np.uint64,
+                'secret': np.uint64,
+                'tries': np.uint8,
+                'won': np.bool_,
+                'guesses': np.uint64,
+                'places': np.uint8,
+                'colours': np.uint8}
+
+
+def default_format():
+    """ Parquet when pyarrow is installed, npz otherwise
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'npz'
+    return 'parquet'
+
+
+class GameExporter:
+    """ Buffer finished games and write them by chunks of chunk_size games.
+        The part files of an exporter are named after its prefix, so several
+        exporters, in several processes, can write to the same directory.
+    """
+
+    def __init__(self, directory, format=None, chunk_size=10000, prefix='games'):
+        self._format = format or default_format()
+        if self._format not in FORMATS:
+            raise ValueError(f"Unknown export format: {self._format}")
+
+        self._directory = directory
+        self._chunk_size = chunk_size
+        self._prefix = prefix
+        self._nb_parts = 0
+        self._parquet_writer = None
+        self._columns = {x: [] for x in GAME_COLUMNS + TRY_COLUMNS}
+        self._nb_buffered = 0
+        os.makedirs(directory, exist_ok=True)
+
+
+    def add_game(self, core):
+        """ Append the current game of a core, once it is over
+        """
+        history = core.history
+        columns = self._columns
+        columns['config_hash'].append(core.config_hash)
+        columns['secret'].append(core.packed_secret)
+        columns['tries'].append(len(history))
+        columns['won'].append(len(history) > 0 and history.last_places == core.code_length)
+        for guess, places, colours in history:
+            columns['guesses'].append(guess)
+            columns['places'].append(places)
+            columns['colours'].append(colours)
+
+        self._nb_buffered += 1
+        if self._nb_buffered >= self._chunk_size:
+            self.flush()
+
+
+    def flush(self):
+        """ Write the buffered games as a new chunk
+        """
+        if not self._nb_buffered:
+            return
+
+        arrays = {name: np.array(values, dtype=COLUMN_TYPES[name]) for name, values in self._columns.items()}
+        if self._format == 'npz':
+            path = os.path.join(self._directory, f"{self._prefix}-{self._nb_parts:05d}.npz")
+            np.savez(path, **arrays)
+            self._nb_parts += 1
+        else:
+            self._write_row_group(arrays)
+
+        for values in self._columns.values():
+            values.clear()
+        self._nb_buffered = 0
+
+
+    def close(self):
+        self.flush()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def _write_row_group(self, arrays):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        offsets = np.zeros(len(arrays['tries']) + 1, dtype=np.int32)
+        np.cumsum(arrays['tries'], out=offsets[1:])
+        offsets = pa.array(offsets)
+
+        table = pa.table({**{x: arrays[x] for x in GAME_COLUMNS},
+                          **{x: pa.ListArray.from_arrays(offsets, arrays[x]) for x in TRY_COLUMNS}})
+        if self._parquet_writer is None:
+            path = os.path.join(self._directory, f"{self._prefix}.parquet")
+            self._parquet_writer = pq.ParquetWriter(path, table.schema)
+        self._parquet_writer.write_table(table)
+
+
+def iter_chunks(directory):
+    """ Stream the exported chunks of a directory as dicts of arrays, the
+        per-try columns being flattened as in the .npz files.
+    """
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith('.npz'):
+            with np.load(path) as chunk:
+                yield {x: chunk[x] for x in chunk.files}
+
+        elif name.endswith('.parquet'):
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(path)
+            for index in range(parquet_file.num_row_groups):
+                table = parquet_file.read_row_group(index)
+                chunk = {x: table.column(x).to_numpy() for x in GAME_COLUMNS}
+                for column in TRY_COLUMNS:
+                    chunk[column] = table.column(column).combine_chunks().flatten().to_numpy()
+                yield chunk
+
+
+def load_games(directory):
+    """ Load all the exported games of a directory into a dict of arrays
+    """
+    chunks = list(iter_chunks(directory))
+    return {x: np.concatenate([chunk[x] for chunk in chunks]) if chunks else np.array([], dtype=COLUMN_TYPES[x])
+            for x in GAME_COLUMNS + TRY_COLUMNS}
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+Hints on the current state of a game: the number of codes still consistent
+with the feedback, and the best next guess.
+
+Both only depend on the configuration and on the set of guesses played, not
+on their order, so the results are cached by this canonical state and shared
+by every game reaching it. Most players go through the same early states.
+"""
+
+
+from collections import OrderedDict
+
+from mastermind.opening_book import cached_opening_book
+from mastermind.solver import Solver
+
+
+class HintCache:
+    """ Bounded cache of the hints, evicting the least recently used states
+    """
+
+    def __init__(self, max_size=4096):
+        self._entries = OrderedDict()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def get(self, key):
+        """ Return the entry of a state, or None when it is not cached
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+
+    def peek(self, key):
+        """ Return the entry of a state, or None, without counting a hit or a
+            miss
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries),
+                'max_size': self.max_size}
+
+
+# Hints shared by all the games of the process
+cache = HintCache()
+
+
+class _StateHints:
+    """ Hints of a state, the suggestions being computed on demand
+    """
+
+    __slots__ = ('nb_candidates', 'suggestions')
+
+    def __init__(self, nb_candidates):
+        self.nb_candidates = nb_candidates
+        self.suggestions = {}
+
+
+def state_key(core):
+    """ Canonical state of a game: its configuration and its sorted guesses
+    """
+    return core.config_hash, tuple(sorted(core.history))
+
+
+def remaining_candidates_count(core, cancel_event=None):
+    """ Number of codes consistent with the feedback of the game's guesses.
+        Setting the optional threading.Event stops the count, see Solver.
+    """
+    key = state_key(core)
+    hints = cache.get(key)
+    if hints is None:
+        hints = _StateHints(Solver(core, cancel_event=cancel_event).nb_candidates)
+        cache.put(key, hints)
+    return hints.nb_candidates
+
+
+def suggest_guess(core, strategy='minimax', cancel_event=None):
+    """ Best next guess of the game for a strategy, as a packed code. Setting
+        the optional threading.Event stops the search, see Solver.
+    """
+    # Loaded opening books answer without a search
+    book = cached_opening_book(core.config, strategy)
+    if book is not None:
+        guess = book.lookup(core.history)
+        if guess is not None:
+            return guess
+
+    key = state_key(core)
+    hints = cache.peek(key)
+    if hints is not None and strategy in hints.suggestions:
+        cache.hits += 1
+        return hints.suggestions[strategy]
+
+    # A state cached without a suggestion for the strategy still needs a search
+    cache.misses += 1
+    solver = Solver(core, strategy, cancel_event=cancel_event)
+    if hints is None:
+        hints = _StateHints(solver.nb_candidates)
+        cache.put(key, hints)
+
+    guess = hints.suggestions[strategy] = solver.next_guess()
+    return guess
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+Compact storage of the player's guesses of a game.
+
+The history is preallocated for the maximum number of tries: the guesses are
+stored as packed codes in an array of unsigned 64 bits integers, and their
+feedback as pairs of bytes. Rows are read back as (packed guess, matching
+places, matching colours) tuples.
+"""
+
+
+from array import array
+
+
+class GuessHistory:
+    """ Fixed capacity list of the guesses of a game and their feedback
+    """
+
+    __slots__ = ('_guesses', '_feedback', '_length')
+
+    def __init__(self, max_tries, code_space_size):
+        if code_space_size <= 1 << 64:
+            self._guesses = array('Q', bytes(8 * max_tries))
+        else:
+            # Codes of huge configurations do not fit into 64 bits
+            self._guesses = [0] * max_tries
+
+        self._feedback = bytearray(2 * max_tries)
+        self._length = 0
+
+
+    @property
+    def capacity(self):
+        return len(self._guesses)
+
+
+    @property
+    def is_full(self):
+        return self._length >= len(self._guesses)
+
+
+    @property
+    def last_places(self):
+        return self[-1][1]
+
+
+    @property
+    def last_colours(self):
+        return self[-1][2]
+
+
+    def __len__(self):
+        return self._length
+
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[x] for x in range(*row.indices(self._length))]
+
+        if row < 0:
+            row += self._length
+        if not 0 <= row < self._length:
+            raise IndexError(f"Guess #{row} is out of the history range")
+
+        return self._guesses[row], self._feedback[2 * row], self._feedback[2 * row + 1]
+
+
+    def __iter__(self):
+        for row in range(self._length):
+            yield self._guesses[row], self._feedback[2 * row], self._feedback[2 * row + 1]
+
+
+    def append(self, guess, places, colours):
+        """ Add a guess and its feedback. Raise IndexError when the history is
+            full.
+        """
+        row = self._length
+        if row >= len(self._guesses):
+            raise IndexError(f"The history is limited to {len(self._guesses)} guesses")
+
+        self._guesses[row] = guess
+        self._feedback[2 * row] = places
+        self._feedback[2 * row + 1] = colours
+        self._length = row + 1
+
+
+    def clear(self):
+        """ Forget all the guesses, keeping the allocated storage
+        """
+        self._length = 0
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+
+"""
+Append-only journal of the played games.
+
+The journal file starts with a magic header followed by length-prefixed
+records. Each record is made of its body length (uint32), its type (uint8) and
+its body, all integers being little-endian:
+
+ - CONFIG: configuration hash (uint64), code length (uint8), max tries
+   (uint16), duplicates allowed (uint8), number of colours (uint8), then the
+   colours in the codec order, each as a length (uint8) and UTF-8 bytes,
+ - NEW_GAME: game id (uint64), id of the previous game of the same core
+   (uint64, NO_GAME for the first one), offset of the CONFIG record (uint64),
+   timestamp (float64), then the packed secret code,
+ - GUESS: game id (uint64), offset of the previous record of the game
+   (uint64), timestamp (float64), matching places (uint8), matching colours
+   (uint8), then the packed guess.
+
+Packed codes are stored on the smallest number of bytes able to hold every
+code of the configuration.
+
+A sidecar index file (journal path + '.idx') holds, for each game id, the
+offsets of its NEW_GAME, CONFIG and last records. A game is read by following
+the links of its records back from the last one, without scanning the journal,
+whether it is over or not.
+
+The settings of the configurations are bounded (see mastermind.config) so that
+they fit into the fields of the CONFIG records.
+"""
+
+
+from collections import namedtuple
+import mmap
+import os
+import struct
+import time
+
+from mastermind.codec import CodeCodec
+from mastermind.mastermind_core import MastermindCore
+from mastermind.mastermind_core import MaxTriesReachedError
+
+
+MAGIC = b'MMJRNL02'
+
+CONFIG = 0
+NEW_GAME = 1
+GUESS = 2
+
+NO_GAME = (1 << 64) - 1
+
+RECORD_HEADER = struct.Struct('<IB')
+CONFIG_BODY = struct.Struct('<QBHBB')
+NEW_GAME_BODY = struct.Struct('<QQQd')
+GUESS_BODY = struct.Struct('<QQdBB')
+INDEX_ENTRY = struct.Struct('<QQQ')
+
+# Size of the write buffer that triggers a flush
+DEFAULT_FLUSH_SIZE = 1 << 16
+
+
+Config = namedtuple('Config', ['code_length', 'max_tries', 'allow_duplicates', 'colours'])
+Guess = namedtuple('Guess', ['guess', 'places', 'colours', 'timestamp'])
+Game = namedtuple('Game', ['game_id', 'config', 'secret', 'timestamp', 'guesses'])
+
+
+class JournalFormatError(Exception):
+    pass
+
+
+def code_width(codec):
+    """ Number of bytes used to store the packed codes of a configuration
+    """
+    return max(1, ((codec.size - 1).bit_length() + 7) // 8)
+
+
+class JournalWriter:
+    """ Buffered writer of a journal, attached to cores with attach()
+    """
+
+    def __init__(self, path, flush_size=DEFAULT_FLUSH_SIZE):
+        self._path = path
+        self._flush_size = flush_size
+        self._file = open(path, 'ab')
+        # Entries are updated in place as their games go on, which appending
+        # does not allow
+        self._index_fd = os.open(path + '.idx', os.O_RDWR | os.O_CREAT, 0o644)
+
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+            self._file.flush()
+
+        self._offset = self._file.tell()
+        self._next_game_id = os.fstat(self._index_fd).st_size // INDEX_ENTRY.size
+        self._buffer = bytearray()
+
+        # Index entries of the games still being played, and the entries to
+        # write on the next flush, keyed by game id
+        self._games = {}
+        self._index_updates = {}
+
+        # Offset of the CONFIG record of each configuration written so far
+        self._config_offsets = {}
+
+
+    @property
+    def path(self):
+        return self._path
+
+
+    def attach(self, core):
+        """ Journal the games of a core, starting with a new game
+        """
+        core.journal = self
+        core._journal_game_id = None
+        core.reset_game()
+
+
+    def record_new_game(self, core, secret, previous_game_id=None):
+        """ Append the start of a game with its packed secret code and return
+            the game id. Called by the core on reset_game().
+        """
+        config_offset = self._config_offset(core)
+        game_id = self._next_game_id
+        self._next_game_id += 1
+        # The core has moved on from its previous game
+        self._games.pop(previous_game_id, None)
+
+        entry = self._games[game_id] = [self._offset, config_offset, self._offset]
+        self._index_updates[game_id] = tuple(entry)
+        body = NEW_GAME_BODY.pack(game_id, NO_GAME if previous_game_id is None else previous_game_id,
+                                  config_offset, time.time())
+        self._append(NEW_GAME, body + int(secret).to_bytes(code_width(core.codec), 'little'))
+        return game_id
+
+
+    def record_guess(self, core, game_id, guess, places, colours):
+        """ Append a packed guess and its feedback. Called by the core on
+            add_guess().
+        """
+        entry = self._games[game_id]
+        offset = self._offset
+        body = GUESS_BODY.pack(game_id, entry[2], time.time(), places, colours)
+        self._append(GUESS, body + int(guess).to_bytes(code_width(core.codec), 'little'))
+
+        entry[2] = offset
+        self._index_updates[game_id] = tuple(entry)
+        # The core still accepts guesses after a win, the game is only over
+        # once its history is full or the core starts the next one
+        if len(core.history) >= core.max_tries:
+            del self._games[game_id]
+
+
+    def flush(self):
+        """ Write the buffered records, then their index entries
+        """
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._buffer.clear()
+
+        # Write the runs of consecutive game ids at once
+        game_ids = sorted(self._index_updates)
+        start = 0
+        while start < len(game_ids):
+            stop = start + 1
+            while stop < len(game_ids) and game_ids[stop] == game_ids[stop - 1] + 1:
+                stop += 1
+            entries = b''.join(INDEX_ENTRY.pack(*self._index_updates[x]) for x in game_ids[start:stop])
+            os.pwrite(self._index_fd, entries, game_ids[start] * INDEX_ENTRY.size)
+            start = stop
+        self._index_updates.clear()
+
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        os.close(self._index_fd)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def _append(self, record_type, body):
+        self._buffer += RECORD_HEADER.pack(len(body), record_type)
+        self._buffer += body
+        self._offset += RECORD_HEADER.size + len(body)
+        if len(self._buffer) >= self._flush_size:
+            self.flush()
+
+
+    def _config_offset(self, core):
+        codec = core.codec
+        config_hash = core.config_hash
+
+        offset = self._config_offsets.get(config_hash)
+        if offset is None:
+            offset = self._offset
+            body = bytearray(CONFIG_BODY.pack(config_hash, codec.code_length, core.max_tries,
+                                              core.allow_duplicates, codec.nb_colours))
+            for colour in codec.colours:
+                name = colour.encode('utf-8')
+                body.append(len(name))
+                body += name
+            self._append(CONFIG, bytes(body))
+            self._config_offsets[config_hash] = offset
+        return offset
+
+
+class JournalReader:
+    """ Memory-mapped reader of a journal
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as journal_file:
+            self._data = mmap.mmap(journal_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(MAGIC)] != MAGIC:
+            raise JournalFormatError(f"{path} is not a game journal")
+
+        index_path = path + '.idx'
+        self._index = None
+        if os.path.exists(index_path) and os.path.getsize(index_path) > 0:
+            with open(index_path, 'rb') as index_file:
+                self._index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+    @property
+    def nb_games(self):
+        return len(self._index) // INDEX_ENTRY.size if self._index is not None else 0
+
+
+    def close(self):
+        self._data.close()
+        if self._index is not None:
+            self._index.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def records(self, offset=None):
+        """ Stream the (offset, type, body) of the records, from the start of
+            the journal or from the given offset.
+        """
+        data = self._data
+        offset = len(MAGIC) if offset is None else offset
+        end = len(data)
+        while offset + RECORD_HEADER.size <= end:
+            length, record_type = RECORD_HEADER.unpack_from(data, offset)
+            body_start = offset + RECORD_HEADER.size
+            if body_start + length > end:
+                # Truncated record, written while the journal was being read
+                break
+            yield offset, record_type, memoryview(data)[body_start:body_start + length]
+            offset = body_start + length
+
+
+    def read_game(self, game_id):
+        """ Rebuild the record of a game, seeking to its records through the
+            index
+        """
+        if not 0 <= game_id < self.nb_games:
+            raise KeyError(f"Unknown game: {game_id}")
+
+        game_offset, config_offset, offset = INDEX_ENTRY.unpack_from(self._index, game_id * INDEX_ENTRY.size)
+        config = self._read_config(config_offset)
+        codec = CodeCodec(config.colours, config.code_length)
+
+        # Follow the guesses back from the last one
+        guesses = []
+        while offset != game_offset:
+            record_type, body = self._record(offset)
+            if record_type != GUESS:
+                raise JournalFormatError(f"No guess record at offset {offset}")
+
+            guess_game, previous, guess_time, places, colours = GUESS_BODY.unpack_from(body)
+            if guess_game != game_id:
+                raise JournalFormatError(f"The guess record at offset {offset} is not part of game {game_id}")
+            guess = int.from_bytes(body[GUESS_BODY.size:], 'little')
+            guesses.append(Guess(codec.decode(guess), places, colours, guess_time))
+            offset = previous
+        guesses.reverse()
+
+        record_type, body = self._record(game_offset)
+        if record_type != NEW_GAME:
+            raise JournalFormatError(f"No new game record at offset {game_offset}")
+        _, _, _, timestamp = NEW_GAME_BODY.unpack_from(body)
+        secret = int.from_bytes(body[NEW_GAME_BODY.size:], 'little')
+
+        return Game(game_id, config, codec.decode(secret), timestamp, guesses)
+
+
+    def restore_game(self, game_id):
+        """ Return a MastermindCore in the state of a journaled game
+        """
+        game = self.read_game(game_id)
+        core = MastermindCore(quiet=True)
+        core.configure(code_length=game.config.code_length,
+                       allow_duplicates=game.config.allow_duplicates,
+                       max_tries=game.config.max_tries,
+                       colours_set=game.config.colours)
+        core.secret_code = game.secret
+        for guess in game.guesses:
+            try:
+                core.add_guess(guess.guess)
+            except MaxTriesReachedError:
+                pass
+        return core
+
+
+    def _record(self, offset):
+        """ Return the type and body of the record at an offset
+        """
+        for _, record_type, body in self.records(offset):
+            return record_type, body
+        raise JournalFormatError(f"No record at offset {offset}")
+
+
+    def _read_config(self, offset):
+        record_type, body = self._record(offset)
+        if record_type != CONFIG:
+            raise JournalFormatError(f"No configuration record at offset {offset}")
+
+        _, code_length, max_tries, allow_duplicates, nb_colours = CONFIG_BODY.unpack_from(body)
+        colours = []
+        position = CONFIG_BODY.size
+        for _ in range(nb_colours):
+            length = body[position]
+            colours.append(bytes(body[position + 1:position + 1 + length]).decode('utf-8'))
+            position += 1 + length
+
+        return Config(code_length, max_tries, bool(allow_duplicates), tuple(colours))
@@ -1,16 +1,19 @@
 import kivy
 from kivy.app import App
 
+from kivy.base import EventLoop
+from kivy.clock import Clock
 from kivy.factory import Factory
-from kivy.core.window import Window
+from kivy.properties import ObjectProperty
 
 from kivy.uix.pagelayout import PageLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.widget import Widget
 from kivy.uix.button import Label
 from kivy.uix.button import Button
-from kivy.uix.image import Image
+from kivy.core.image import Image as CoreImage
 
+from mastermind.analysis import GameAnalyser
 from mastermind.mastermind_core import MastermindCore
 from mastermind.mastermind_core import MaxTriesReachedError
 from mastermind.mastermind_core import BadGuessLengthError
@@ -23,14 +26,40 @@ import logging
 kivy.require('1.9.0')
 
 
+# Atlas holding the images of the pegs, spots and validators, generated from
+# the resources directory with:
+#   python -m kivy.atlas mastermind 512x1024 peg_*.png empty_hole.png \
+#       hidden_spot.png validator_colour.png validator_position.png
+ATLAS = 'atlas://resources/mastermind'
+
+
+def preload_textures():
+    """ Load the atlas, and upload its texture, before any widget uses it
+    """
+    CoreImage(f'{ATLAS}/empty_hole')
+
+
+def load_background_texture():
+    """ Load the board background texture, repeated over the board
+    """
+    texture = CoreImage('resources/light_wood_texture.jpg').texture
+    texture.wrap = 'repeat'
+    texture.uvsize = (4, 4)
+    return texture
+
+
+def schedule_on_next_frame(function):
+    """ Run a function from the UI thread, before the next frame is drawn
+    """
+    Clock.schedule_once(lambda dt: function())
+
+
 class MastermindBoard(PageLayout):
     """ Base widget class for the application.
     """
 
-    # Define the board background texture
-    background_texture = Image(source = 'resources/light_wood_texture.jpg').texture
-    background_texture.wrap = 'repeat'
-    background_texture.uvsize = (4, 4)
+    # Board background texture, loaded by the application when it starts
+    background_texture = ObjectProperty(None, allownone=True)
 
 
     def __init__(self, **kwargs):
@@ -38,15 +67,39 @@ class MastermindBoard(PageLayout):
         self.selected_colour = None              # Store the currently selected colour
         self.current_row = []                    # Store the state of the currently played row
         self.widgets = {}                        # Store the widgets that needs an update during the game
+        self.board_shape = None                  # Store the configuration the board has been built for
+        self.end_game_popup = None               # Popup reused at the end of each game
+        self.pending_updates = []                # Widget changes applied at the next frame
+
+        # Changes queued during a frame are applied together by a single call
+        self.apply_updates_trigger = Clock.create_trigger(self.apply_updates)
+        # Hints on the game computed in the background, out of the UI thread
+        self.analyser = GameAnalyser(schedule=schedule_on_next_frame)
 
 
     def init_game(self):
         # Initialise the mastermmind game
         self.logic_manager.reset_game()
 
+        # Drop the updates and the analysis of the previous game
+        self.pending_updates = []
+        self.analyser.cancel()
+        self.analyse_game()
+
         # Initialise variables used for gui logic
         self.selected_colour = None
         self.current_row = [None] * self.logic_manager.code_length
+
+        # The board is only built again when its shape changes, otherwise
+        # the existing widgets are reset in place
+        board_shape = (self.logic_manager.code_length,
+                       self.logic_manager.max_tries,
+                       self.logic_manager.codec.colours)
+        if board_shape == self.board_shape:
+            self.reset_main_board()
+            return
+
+        self.board_shape = board_shape
         self.widgets = {}
 
         # Initialise the GUI
@@ -54,13 +107,44 @@ class MastermindBoard(PageLayout):
         self.ids.pegs_reservoir.clear_widgets(self.ids.pegs_reservoir.children)
 
         # Set window size
-        Window.size_hint = (None, None)
-        Window.size = (800, self.logic_manager.max_tries * 50 + 150)
+        window = EventLoop.window
+        window.size_hint = (None, None)
+        window.size = (800, self.logic_manager.max_tries * 50 + 150)
 
         self.draw_main_board()
         self.draw_pegs_reservoir()
 
 
+    def reset_main_board(self):
+        """ Reset the widgets of the board for a new game: hide the new secret
+            code, empty the spots, remove the validators and disable all the
+            rows but the first one.
+        """
+        code = self.logic_manager.secret_code
+        for col in range(self.logic_manager.code_length):
+            spot = self.widgets[f'hidden_spot_{col}']
+            spot.hidden_colour = code[col]
+            spot.background_normal = f'{ATLAS}/hidden_spot'
+            spot.background_disabled_normal = f'{ATLAS}/hidden_spot'
+
+        for row in range(self.logic_manager.max_tries):
+            # Keep the spacers of the checkers, used for alignment
+            for name in ('pos', 'col'):
+                checker = self.widgets[f"{name}_check_{row}"]
+                spacer = self.widgets[f"{name}_spacer_{row}"]
+                checker.clear_widgets([x for x in checker.children if x is not spacer])
+
+            for col in range(self.logic_manager.code_length):
+                spot = self.widgets[f"peg_spot_{row}_{col}"]
+                spot.background_normal = f'{ATLAS}/empty_hole'
+                spot.background_disabled_normal = f'{ATLAS}/empty_hole'
+                spot.disabled = row > 0
+
+            button_validate = self.widgets[f"butt_validate_{row}"]
+            button_validate.text = ""
+            button_validate.disabled = True
+
+
     def draw_main_board(self):
         """ Draw the board that contains the spot, the indications on correct
             positions and colours, and the validation button.
@@ -89,9 +173,11 @@ class MastermindBoard(PageLayout):
 
             # Add the widget that shows the correct positions for each guess
             position_checker = GridLayout(rows=1)
-            position_checker.add_widget(Widget())
+            spacer = Widget()
+            position_checker.add_widget(spacer)
             board.add_widget(position_checker)
             self.widgets[f"pos_check_{row}"] = position_checker
+            self.widgets[f"pos_spacer_{row}"] = spacer
 
             # Add the number of columns matching the number of pegs to guess
             max_cols = self.logic_manager.code_length
@@ -112,9 +198,11 @@ class MastermindBoard(PageLayout):
             # Add the widget that shows the correct colours for each guess
             colours_checker = GridLayout()
             colours_checker.rows = 1
-            colours_checker.add_widget(Widget())
+            spacer = Widget()
+            colours_checker.add_widget(spacer)
             board.add_widget(colours_checker)
             self.widgets[f"col_check_{row}"] = colours_checker
+            self.widgets[f"col_spacer_{row}"] = spacer
 
             # Add the button that allows the player to validate the current row
             button_validate = Button(
@@ -133,14 +221,47 @@ class MastermindBoard(PageLayout):
         """ Draw the pegs available to the player below the board
         """
         reserv = self.ids.pegs_reservoir
-        for peg_colour in self.logic_manager.colours_set:
+        for peg_colour in self.logic_manager.codec.colours:
             peg = Factory.Peg()
             peg.peg_color = peg_colour
-            peg.background_normal = f'resources/peg_{peg_colour}.png'
+            peg.background_normal = f'{ATLAS}/peg_{peg_colour}'
             peg.bind(on_press = self.select_colour)
             reserv.add_widget(peg)
 
 
+    def queue_update(self, update):
+        """ Queue a function changing widgets, to be applied at the next frame
+            along with the other changes queued until then
+        """
+        self.pending_updates.append(update)
+        self.apply_updates_trigger()
+
+
+    def apply_updates(self, dt=None):
+        """ Apply the widget changes queued since the last frame
+        """
+        updates, self.pending_updates = self.pending_updates, []
+        for update in updates:
+            update()
+
+
+    def analyse_game(self):
+        """ Start the analysis of the current state of the game, replacing the
+            one in progress
+        """
+        self.ids.analysis_label.text = "Analysing..."
+        self.analyser.submit(self.logic_manager, self.show_analysis)
+
+
+    def show_analysis(self, analysis):
+        """ Display the hints computed by the analyser
+        """
+        text = f"{analysis.nb_candidates} possible codes"
+        if analysis.suggestion is not None:
+            text += f", try: {' '.join(analysis.suggestion)}"
+        self.ids.analysis_label.text = text
+
+
     def add_logic_manager(self, logic_manager):
         """ Add the logic manager in order to respond to user interface requests
         """
@@ -151,8 +272,8 @@ class MastermindBoard(PageLayout):
         """ Action to position a peg onto the player board
         """
         if self.selected_colour:
-            peg_spot.background_normal = f'resources/peg_{self.selected_colour}.png'
-            peg_spot.background_disabled_normal = f'resources/peg_{self.selected_colour}.png'
+            peg_spot.background_normal = f'{ATLAS}/peg_{self.selected_colour}'
+            peg_spot.background_disabled_normal = f'{ATLAS}/peg_{self.selected_colour}'
 
             peg_row = peg_spot.spot_position[0]
             peg_col = peg_spot.spot_position[1]
@@ -177,16 +298,20 @@ class MastermindBoard(PageLayout):
             has_win = self.logic_manager.add_guess(self.current_row)
 
             if has_win:
+                self.analyser.cancel()
                 self.display_end_of_game_popup(has_won=True)
             else:
                 self.update_board_state()
+                self.analyse_game()
 
         except MaxTriesReachedError as mtre:
+            self.analyser.cancel()
+
             # Reveal the hidden secret code
             for col in range(self.logic_manager.code_length):
                 spot = self.widgets[f'hidden_spot_{col}']
-                spot.background_normal = f'resources/peg_{spot.hidden_colour}.png'
-                spot.background_disabled_normal = f'resources/peg_{spot.hidden_colour}.png'
+                spot.background_normal = f'{ATLAS}/peg_{spot.hidden_colour}'
+                spot.background_disabled_normal = f'{ATLAS}/peg_{spot.hidden_colour}'
 
             self.display_end_of_game_popup(has_won=False)
 
@@ -207,27 +332,35 @@ class MastermindBoard(PageLayout):
 
         current_row = self.logic_manager.nb_player_guesses - 1
 
-        # Add the correct positions widgets
-        for i in range(correct_positions):
-            lbl = Factory.PositionValidator()
-            self.widgets[f'pos_check_{current_row}'].add_widget(lbl)
-
-        # Add the correct colours widgets
-        for i in range(correct_colours):
-            lbl = Factory.ColourValidator()
-            self.widgets[f'col_check_{current_row}'].add_widget(lbl, index = 2)
-
         # Initialise the row vector for the new row
         self.current_row = [None] * self.logic_manager.code_length
 
         # Remove the validate button
         self.toggle_validate_button(current_row)
 
-        # Close the current row (set buttons to disabled) and initialise the new row
+        # Close the current row (set buttons to disabled) and initialise the new
+        # row right away, so that no other tap lands on the closed row
         for col in range(self.logic_manager.code_length):
             self.widgets[f"peg_spot_{current_row}_{col}"].disabled = True
             self.widgets[f"peg_spot_{current_row+1}_{col}"].disabled = False
 
+        # The response to the guess is displayed at the next frame
+        self.queue_update(lambda: self.update_row_widgets(current_row, correct_positions, correct_colours))
+
+
+    def update_row_widgets(self, row, correct_positions, correct_colours):
+        """ Display the response to the guess of a row
+        """
+        # Add the correct positions widgets
+        position_checker = self.widgets[f'pos_check_{row}']
+        for i in range(correct_positions):
+            position_checker.add_widget(Factory.PositionValidator())
+
+        # Add the correct colours widgets
+        colours_checker = self.widgets[f'col_check_{row}']
+        for i in range(correct_colours):
+            colours_checker.add_widget(Factory.ColourValidator(), index = 2)
+
 
     def toggle_validate_button(self, row, set_enable=None):
         """ Toggle the validate button at the end of the row
@@ -251,17 +384,18 @@ class MastermindBoard(PageLayout):
         else:
             end_game_msg = "LOST"
 
-        popup = Factory.EndGame()
+        popup = self.end_game_popup
+        if popup is None:
+            popup = Factory.EndGame()
+            popup.ids.play_again_button.bind(on_press = self.play_again)
+            self.end_game_popup = popup
+
         popup.ids.end_game_state.text = f"You have {end_game_msg}!"
-        popup.ids.play_again_button.bind(on_press = self.play_again)
-        self.widgets['end_game_popup'] = popup
         popup.open()
 
 
     def play_again(self, event):
-        self.widgets['end_game_popup'].dismiss()
-        del self.widgets['end_game_popup']
-
+        self.end_game_popup.dismiss()
         self.init_game()
 
 
@@ -273,10 +407,21 @@ class MastermindApp(App):
     def build(self):
         logging.getLogger().setLevel(logging.INFO)
 
+        # Textures can only be loaded once the window, and its graphics
+        # context, exist
+        EventLoop.ensure_window()
+        preload_textures()
+
         self.mastermind_core = MastermindCore()
         self.title = 'Mastermind'
 
         board = MastermindBoard()
+        board.background_texture = load_background_texture()
         board.add_logic_manager(self.mastermind_core)
         board.init_game()
+        self.board = board
         return board
+
+
+    def on_stop(self):
+        self.board.analyser.close()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""
+Load generator for the game server.
+
+Concurrent clients connect to the server, each playing games with random
+guesses, and the latency of every request is recorded to report the request
+throughput and the latency percentiles.
+"""
+
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+class GameClient:
+    """ Minimal client of the game server's JSON protocol
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=7777, unix_path=None):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+
+    async def request(self, op, **parameters):
+        """ Send a request and wait for its response
+        """
+        self._next_id += 1
+        message = dict(parameters, op=op, id=self._next_id)
+        self._writer.write(json.dumps(message).encode('utf-8') + b'\n')
+        await self._writer.drain()
+        return json.loads(await self._reader.readline())
+
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+async def play_games(client, nb_games, rng, latencies):
+    """ Play games with random guesses, recording the latency of each request
+    """
+    async def timed_request(op, **parameters):
+        start = time.perf_counter()
+        response = await client.request(op, **parameters)
+        latencies.append(time.perf_counter() - start)
+        if not response['ok']:
+            raise RuntimeError(f"{op} failed: {response['error']}")
+        return response
+
+    session = None
+    for _ in range(nb_games):
+        if session is None:
+            game = await timed_request('new_game')
+            session = game['session']
+        else:
+            game = await timed_request('new_game', session=session)
+
+        response = {'game_over': False}
+        while not response['game_over']:
+            guess = [rng.choice(game['colours_set']) for _ in range(game['code_length'])]
+            response = await timed_request('guess', session=session, guess=guess)
+
+    await timed_request('close', session=session)
+
+
+def percentile(sorted_values, ratio):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(ratio * len(sorted_values)))]
+
+
+async def run_load(host='127.0.0.1', port=7777, unix_path=None, clients=50, games=20, seed=0):
+    """ Run the clients concurrently and return the measured statistics
+    """
+    latencies = []
+    connections = [await GameClient.connect(host, port, unix_path) for _ in range(clients)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(play_games(client, games, random.Random(f"{seed}:{i}"), latencies)
+                           for i, client in enumerate(connections)))
+    elapsed = time.perf_counter() - start
+
+    for client in connections:
+        await client.close()
+
+    latencies.sort()
+    return {'clients': clients,
+            'games': clients * games,
+            'requests': len(latencies),
+            'elapsed': elapsed,
+            'requests_per_second': len(latencies) / elapsed,
+            'latency_p50_ms': percentile(latencies, 0.50) * 1000,
+            'latency_p95_ms': percentile(latencies, 0.95) * 1000,
+            'latency_p99_ms': percentile(latencies, 0.99) * 1000,
+            'latency_max_ms': latencies[-1] * 1000 if latencies else 0.0}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Measure the latency and throughput of the game server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--unix', help="Connect to this Unix socket path instead of TCP")
+    parser.add_argument('--clients', type=int, default=50, help="Number of concurrent connections")
+    parser.add_argument('--games', type=int, default=20, help="Number of games per client")
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args(args)
+
+    results = asyncio.run(run_load(options.host, options.port, options.unix,
+                                   options.clients, options.games, options.seed))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
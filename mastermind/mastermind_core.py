@@ -3,21 +3,30 @@
 """
 Mastermind game files that contains the game's logic.
 
-The game can be used from the cli (although quite unfriendly) or
+The game can be used from the cli (python -m mastermind) or
 from a UI that instanciate the MastermindCore class.
 """
 
 
-from collections import Counter
-from random import randrange
 import logging
+import random
 
+from mastermind import candidates
+from mastermind.config import BadColoursSetError
+from mastermind.config import DEFAULT_COLOURS
+from mastermind.config import GameConfig
+from mastermind.history import GuessHistory
+from mastermind.score_table import code_digits
+from mastermind.score_table import score_digits
+from mastermind.score_table import split_feedback_code
+
+import numpy as np
 
-class BadGuessLengthError(Exception):
-    pass
 
+logger = logging.getLogger(__name__)
 
-class BadColoursSetError(Exception):
+
+class BadGuessLengthError(Exception):
     pass
 
 
@@ -30,10 +39,19 @@ class MaxTriesReachedError(Exception):
 
 
 class MastermindCore:
-    def __init__(self):
-        logging.getLogger().setLevel(logging.INFO)
+    def __init__(self, quiet=False, seed=None):
+        # The quiet mode skips the logging of every game and guess
+        self.quiet = quiet
+        self._rng = random.Random(seed)
+
+        # Optional JournalWriter recording the games and guesses
+        self.journal = None
+        self._journal_game_id = None
 
-        # Initialise default parameters
+        # Metrics collecting the timings of this core, see Metrics.instrument()
+        self.metrics = None
+
+        # Initialise default parameters and a first game
         self.configure()
 
 
@@ -41,26 +59,30 @@ class MastermindCore:
                   code_length = 4,
                   allow_duplicates = True,
                   max_tries = 10,
-                  colours_set = ['Green', 'Yellow', 'Red', 'Orange', 'Blue', 'Black', 'White']):
-        """Configure the game's parameters
+                  colours_set = DEFAULT_COLOURS):
+        """Configure the game's parameters and start a new game, as the secret
+           code of the previous one may not fit them. The settings are
+           validated before any of them is changed.
         """
-        self._code_length = code_length
-        self._allow_duplicates = allow_duplicates
-        self._max_tries = max_tries
-        self._colours_set = set(colours_set)
+        config = GameConfig.get(code_length, allow_duplicates, max_tries, colours_set)
+
+        self._config = config
+        self._code_length = config.code_length
+        self._allow_duplicates = config.allow_duplicates
+        self._max_tries = config.max_tries
+        self._colours_set = config.colours_set
+        self._codec = config.codec
+        self._score_table = config.score_table
+        self._player_guesses = GuessHistory(config.max_tries, config.size)
 
-        # Check out that the colours set is big enough when no duplicates are allowed
-        size_diff = len(colours_set) < code_length
-        if not allow_duplicates and size_diff:
-            raise BadColoursSetError((f"The colours set is too small ({len(colours_set)}) "
-                                       "for the expected code length ({code_length}) "
-                                       "and no duplicates are allowed."))
+        if not self.quiet and logger.isEnabledFor(logging.INFO):
+            logger.info("Configuration updated:")
+            logger.info(" - code_length: %d", self._code_length)
+            logger.info(" - allow_duplicates: %s", self._allow_duplicates)
+            logger.info(" - max_tries: %d", self._max_tries)
+            logger.info(" - colours_set: %s", ', '.join(self._codec.colours))
 
-        logging.info("Configuration updated:")
-        logging.info(f" - code_length: {self._code_length}")
-        logging.info(f" - allow_duplicates: {self._allow_duplicates}")
-        logging.info(f" - max_tries: {self._max_tries}")
-        logging.info(f" - colours_set: {', '.join(self._colours_set)}")
+        self.reset_game()
 
 
     @property
@@ -70,7 +92,22 @@ class MastermindCore:
 
     @property
     def secret_code(self):
-        return self._secret_code
+        return self._codec.decode(self._secret)
+
+
+    @secret_code.setter
+    def secret_code(self, code):
+        """ Start a new game with the given secret code
+        """
+        if len(code) != self._code_length:
+            raise BadGuessLengthError(f"Incorrect secret code size. Expected: {self._code_length}, got: {len(code)}")
+
+        self.reset_game(self._encode(code))
+
+
+    @property
+    def packed_secret(self):
+        return self._secret
 
 
     @property
@@ -78,11 +115,54 @@ class MastermindCore:
         return self._max_tries
 
 
+    @property
+    def allow_duplicates(self):
+        return self._allow_duplicates
+
+
     @property
     def colours_set(self):
         return self._colours_set
 
 
+    @property
+    def config(self):
+        return self._config
+
+
+    @property
+    def codec(self):
+        return self._codec
+
+
+    @property
+    def config_hash(self):
+        return self._config.config_hash
+
+
+    @property
+    def score_table(self):
+        return self._score_table
+
+
+    @property
+    def history(self):
+        """ Player's guesses as a GuessHistory of (packed guess, matching places,
+            matching colours) rows
+        """
+        return self._player_guesses
+
+
+    @property
+    def player_guesses(self):
+        """ Player's guesses translated back to colour names
+        """
+        return [{'guess': self._codec.decode(guess),
+                 'matching_places': matching_places,
+                 'matching_colours': matching_colours}
+                for guess, matching_places, matching_colours in self._player_guesses]
+
+
     @property
     def nb_player_guesses(self):
         return len(self._player_guesses)
@@ -90,32 +170,66 @@ class MastermindCore:
 
     @property
     def last_row_correct_positions(self):
-        row = self.nb_player_guesses - 1
-        return self._player_guesses[row]['matching_places']
+        return self._player_guesses.last_places
 
 
     @property
     def last_row_correct_colours(self):
-        row = self.nb_player_guesses - 1
-        return self._player_guesses[row]['matching_colours']
+        return self._player_guesses.last_colours
+
+
+    def seed(self, seed=None):
+        """ Seed the random generator of the secret codes, to reproduce games
+        """
+        self._rng.seed(seed)
+
+
+    def reset_game(self, secret=None):
+        """ Generate a new code and delete the player's previous guesses. The
+            secret code can be given as a packed code instead.
+        """
+        if secret is None:
+            secret = self._random_secret()
+        elif not 0 <= secret < self._codec.size:
+            raise ValueError(f"Invalid packed secret code: {secret}")
+
+        self._secret = secret
+        self._secret_digits = self._codec.digits(secret)
+        self._player_guesses.clear()
+        if self.journal is not None:
+            self._journal_game_id = self.journal.record_new_game(self, secret, self._journal_game_id)
 
+        if not self.quiet and logger.isEnabledFor(logging.INFO):
+            logger.info("New secret code generated: %s", self.secret_code)
 
-    def reset_game(self):
-        """ Generate a new code and delete the player's previous guesses
+
+    def _random_secret(self):
+        """ Draw a packed secret code
+        """
+        if self._allow_duplicates:
+            # Every packed value is a valid code
+            return self._rng.randrange(self._codec.size)
+
+        digits = self._rng.sample(range(self._codec.nb_colours), self._code_length)
+        return self._codec.pack_digits(digits)
+
+
+    def generate_secret_codes(self, count):
+        """ Draw many packed secret codes at once. Return them as an array.
         """
-        generator = self.generate_code_peg()
-        self._secret_code = [ next(generator) for _ in range(self._code_length) ]
-        self._player_guesses = []
-        logging.info(f"New secret code generated: {self._secret_code}")
+        # Seed the bulk generator from the game's one so that it is reproducible
+        generator = np.random.default_rng(self._rng.getrandbits(64))
+        return candidates.random_codes(self._codec, self._allow_duplicates, count, generator)
 
 
     def generate_code_peg(self):
         """ Create a new code peg at each call
         """
-        colours = [x for x in self._colours_set]
+        # Sort the colours, the iteration order of a set differs between processes
+        colours = sorted(self._colours_set)
 
         while len(colours) > 0:
-            id = randrange(len(colours))
+            id = self._rng.randrange(len(colours))
 
             if self._allow_duplicates:
                 peg = colours[id]
@@ -125,39 +239,141 @@ class MastermindCore:
             yield peg
 
 
-    def add_guess(self, guess):
-        """ Add a new guess to the list of the player's guesses
+    def load_score_table(self):
+        """ Load the precomputed feedback of every (guess, secret) pair, so that
+            scoring a guess becomes a single array lookup. The table is built
+            on first use and cached for the next games and processes.
         """
-        # Check that the player's guess and the secret code sizes match
-        if len(guess) != len(self._secret_code):
-            raise BadGuessLengthError(f"Incorrect player's guess size. Expected: {len(self._secret_code)}, got: {len(guess)}")
+        self._score_table = self._config.load_score_table()
+        return self._score_table
 
-        # Check if colours from the guest list are within the current set
-        wrong_colours = [x for x in guess if x not in self._colours_set]
-        if len(wrong_colours) > 0:
+
+    def _encode(self, code):
+        """ Pack a code given as colour names, checking that all its colours are
+            part of the current set
+        """
+        try:
+            return self._codec.encode(code)
+        except KeyError:
+            wrong_colours = [x for x in code if x not in self._colours_set]
             raise UnknownColourError(f"The player's guess contains colours that are not part of the current set: {', '.join(wrong_colours)}.")
 
-        logging.info(f"Adding new guess #{len(self._player_guesses)}")
 
-        # Find out how many peg of the correct colour are at the correct location
-        matching_locations_count = len([x for i, x in enumerate(self._secret_code) if guess[i] == x])
-        logging.info(f"Matching locations: {matching_locations_count}")
+    def _check_guess(self, guess):
+        """ Validate a guess given as colour names and return it packed
+        """
+        # Check that the player's guess and the secret code sizes match
+        if len(guess) != self._code_length:
+            raise BadGuessLengthError(f"Incorrect player's guess size. Expected: {self._code_length}, got: {len(guess)}")
+
+        # Check if colours from the guest list are within the current set
+        return self._encode(guess)
 
-        matching_colours = Counter(guess) & Counter(self._secret_code)
-        matching_colours_count = sum(matching_colours.values())
-        logging.info(f"Matching colours: {matching_colours_count}")
 
-        self._player_guesses.append({'guess': guess,
-                                    'matching_places': matching_locations_count,
-                                    'matching_colours': matching_colours_count - matching_locations_count})
+    def add_guess(self, guess):
+        """ Add a new guess to the list of the player's guesses
+        """
+        packed_guess = self._check_guess(guess)
 
-        player_won = matching_locations_count == len(self._secret_code)
+        # The history has room for the maximum number of tries only
+        if self._player_guesses.is_full:
+            raise MaxTriesReachedError(f"Solution not found within {self._max_tries} tries")
+
+        # Find out how many peg of the correct colour are at the correct location,
+        # and how many other pegs have a matching colour
+        if self._score_table is not None:
+            matching_locations_count, matching_colours_count = split_feedback_code(
+                self._score_table[packed_guess, self._secret], self._code_length)
+        else:
+            matching_locations_count, matching_colours_count = self._codec.score(
+                self._codec.digits(packed_guess), self._secret_digits)
+
+        self._player_guesses.append(packed_guess, matching_locations_count, matching_colours_count)
+        if self.journal is not None:
+            self.journal.record_guess(self, self._journal_game_id, packed_guess,
+                                      matching_locations_count, matching_colours_count)
+
+        player_won = matching_locations_count == self._code_length
         max_tries_reached = len(self._player_guesses) >= self._max_tries
 
-        logging.info((f"Guess added. Player won: {player_won}, current tries: "
-                      f"{len(self._player_guesses)}, max tries reached: {max_tries_reached}"))
+        if not self.quiet and logger.isEnabledFor(logging.INFO):
+            logger.info("Guess #%d added. Matching locations: %d, matching colours: %d",
+                        len(self._player_guesses) - 1, matching_locations_count, matching_colours_count)
+            logger.info("Player won: %s, current tries: %d, max tries reached: %s",
+                        player_won, len(self._player_guesses), max_tries_reached)
 
         if not player_won and max_tries_reached:
             raise MaxTriesReachedError(f"Solution not found within {self._max_tries} tries")
 
         return player_won
+
+
+    def consistent_codes(self):
+        """ Lazily yield the packed codes consistent with the feedback of the
+            player's guesses, in increasing order
+        """
+        return candidates.consistent_codes(self._codec, self._player_guesses, self._allow_duplicates)
+
+
+    def find_consistent_code(self):
+        """ Return the lowest code consistent with the feedback of the player's
+            guesses, as a list of colours
+        """
+        return self._codec.decode(candidates.find_consistent_code(
+            self._codec, self._player_guesses, self._allow_duplicates))
+
+
+    def count_consistent_codes(self, limit=None):
+        """ Count the codes consistent with the feedback of the player's
+            guesses, stopping at limit
+        """
+        return candidates.count_consistent_codes(self._codec, self._player_guesses,
+                                                 self._allow_duplicates, limit)
+
+
+    def remaining_candidates_count(self):
+        """ Number of codes still consistent with the feedback of the player's
+            guesses. Cached by game state, see mastermind.hints.
+        """
+        # Imported here as the solver depends on this module
+        from mastermind import hints
+        return hints.remaining_candidates_count(self)
+
+
+    def suggest_guess(self, strategy='minimax'):
+        """ Suggest the best next guess, as a list of colours. Cached by game
+            state, see mastermind.hints.
+        """
+        from mastermind import hints
+        return self._codec.decode(hints.suggest_guess(self, strategy))
+
+
+    def score_many(self, guess, codes):
+        """ Compute the feedback of a single guess against many codes at once.
+            The guess is a packed code and codes an array of packed codes.
+
+            Return the number of pegs at the correct position and the number of
+            pegs of the correct colour at a wrong position, as two arrays.
+        """
+        places, colours = self.score_matrix([guess], codes)
+        return places[0], colours[0]
+
+
+    def score_matrix(self, guesses, codes):
+        """ Compute the feedback of every guess against every code, both given
+            as arrays of packed codes.
+
+            Return the number of pegs at the correct position and the number of
+            pegs of the correct colour at a wrong position, as two arrays of
+            shape (len(guesses), len(codes)).
+        """
+        guesses = np.asarray(guesses, dtype=np.int64)
+        codes = np.asarray(codes, dtype=np.int64)
+
+        if self._score_table is not None:
+            feedback = self._score_table[guesses[:, None], codes[None, :]]
+            return np.divmod(feedback, self._code_length + 1)
+
+        return score_digits(code_digits(self._codec, guesses),
+                            code_digits(self._codec, codes),
+                            self._codec.nb_colours)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+"""
+Optional instrumentation of the game engine.
+
+Metrics.instrument() wraps the configure(), reset_game() and add_guess()
+methods of a core, and the validation of the guesses, with timers feeding
+latency histograms, and counts the calls, the errors raised and the game
+outcomes. Cores that are not instrumented run the plain methods, so disabled
+metrics cost nothing.
+
+The collected data is available as a snapshot dict or in the Prometheus text
+format, written to a file (for the textfile collector of the node exporter) or
+served over HTTP. profile() runs a block under cProfile.
+"""
+
+
+from bisect import bisect_left
+from contextlib import contextmanager
+import cProfile
+import http.server
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+
+from mastermind.mastermind_core import MaxTriesReachedError
+
+
+PREFIX = 'mastermind_'
+
+# Operations of the core that are timed
+OPERATIONS = ('configure', 'reset_game', 'add_guess', '_check_guess')
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """ Distribution of observed values, counted by bucket
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        # The last count is for the values above the highest bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+    def as_dict(self):
+        return {'buckets': list(self.buckets), 'counts': list(self.counts),
+                'sum': self.sum, 'count': self.count}
+
+
+class Metrics:
+    """ Counters and latency histograms of instrumented cores
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        # Counters keyed by name and sorted (label, value) pairs
+        self._counters = {}
+        self._histograms = {}
+
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+
+    def observe(self, name, value):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = Histogram()
+        histogram.observe(value)
+
+
+    def instrument(self, core):
+        """ Time and count the operations of a core. Return the core.
+        """
+        if getattr(core, 'metrics', None) is self:
+            return core
+
+        for operation in OPERATIONS:
+            # Instance attributes take precedence over the class methods
+            setattr(core, operation, self._timed(core, operation, getattr(type(core), operation)))
+        core.metrics = self
+        return core
+
+
+    def uninstrument(self, core):
+        for operation in OPERATIONS:
+            core.__dict__.pop(operation, None)
+        core.metrics = None
+
+
+    def _timed(self, core, operation, method):
+        name = operation.lstrip('_')
+        clock = self._clock
+
+        def timed(*args, **kwargs):
+            nb_guesses = core.nb_player_guesses
+            start = clock()
+            try:
+                result = method(core, *args, **kwargs)
+            except Exception as error:
+                self.observe(f'{name}_seconds', clock() - start)
+                self.increment('errors_total', operation=name, type=type(error).__name__)
+                # A failed try that reached the limit ends the game
+                if isinstance(error, MaxTriesReachedError) and core.nb_player_guesses > nb_guesses:
+                    self.increment('games_total', outcome='lost')
+                raise
+
+            self.observe(f'{name}_seconds', clock() - start)
+            self.increment('calls_total', operation=name)
+            if operation == 'add_guess' and result:
+                self.increment('games_total', outcome='won')
+            elif operation == 'reset_game':
+                self.increment('games_total', outcome='started')
+            return result
+
+        timed.__wrapped__ = method
+        return timed
+
+
+    def reset(self):
+        self._counters.clear()
+        self._histograms.clear()
+
+
+    def snapshot(self):
+        """ Return a copy of the metrics as a dict
+        """
+        counters = {}
+        for (name, labels), value in sorted(self._counters.items()):
+            counters.setdefault(name, {})[','.join(f'{x}={y}' for x, y in labels)] = value
+        return {'counters': counters,
+                'histograms': {name: histogram.as_dict() for name, histogram in sorted(self._histograms.items())}}
+
+
+    def prometheus_text(self):
+        """ Return the metrics in the Prometheus text exposition format
+        """
+        lines = []
+        last_name = None
+        for (name, labels), value in sorted(self._counters.items()):
+            if name != last_name:
+                lines.append(f'# TYPE {PREFIX}{name} counter')
+                last_name = name
+            label_text = ','.join(f'{x}="{y}"' for x, y in labels)
+            lines.append(f'{PREFIX}{name}{{{label_text}}} {value}' if labels else f'{PREFIX}{name} {value}')
+
+        for name, histogram in sorted(self._histograms.items()):
+            lines.append(f'# TYPE {PREFIX}{name} histogram')
+            cumulated = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulated += count
+                lines.append(f'{PREFIX}{name}_bucket{{le="{bound:g}"}} {cumulated}')
+            lines.append(f'{PREFIX}{name}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f'{PREFIX}{name}_sum {histogram.sum!r}')
+            lines.append(f'{PREFIX}{name}_count {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+    def write_prometheus(self, path):
+        """ Write the metrics to a file, atomically so that readers never see
+            a partial file
+        """
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w') as metrics_file:
+            metrics_file.write(self.prometheus_text())
+        os.replace(temporary_path, path)
+
+
+    def serve_prometheus(self, host='127.0.0.1', port=9100):
+        """ Serve the metrics over HTTP from a background thread. Return the
+            server, to be stopped with shutdown().
+        """
+        metrics = self
+
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+@contextmanager
+def profile(path=None, sort='cumulative', limit=30, output=None):
+    """ Profile the enclosed block with cProfile. The stats are dumped to path
+        when given, and otherwise printed to output (stderr by default).
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
+        else:
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+            (output or sys.stderr).write(stream.getvalue())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+
+"""
+Precomputed decision trees of the solver.
+
+The decision tree of a configuration and strategy holds the guess the solver
+plays in every state it can reach, so that playing or hinting along the tree
+is a lookup instead of a search. It is stored in a file made of:
+
+ - a header: magic, configuration hash, strategy name, code length, number of
+   colours, duplicates allowed, max tries, number of nodes,
+ - the packed guess of each node (uint32),
+ - for each node, the index of the child node reached with each feedback code
+   (uint32, see score_table.feedback_code), 0 when there is none: the root is
+   node 0, and a winning feedback ends the game.
+
+The file is memory-mapped and indexed in place. Books are built on first use
+and cached on disk, next to the score tables:
+
+    python -m mastermind.opening_book --config 4x7 --config 4x6 --strategy minimax
+"""
+
+
+import argparse
+import logging
+import mmap
+import os
+import struct
+
+from mastermind.config import GameConfig
+from mastermind.mastermind_core import MastermindCore
+from mastermind.score_table import cache_directory
+from mastermind.score_table import feedback_code
+from mastermind.solver import Solver
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'MMBOOK01'
+HEADER = struct.Struct('<8sQ16sBBBHI')
+
+_books = {}
+
+
+class OpeningBookError(Exception):
+    pass
+
+
+class OpeningBook:
+    """ Decision tree of the solver, memory-mapped from its file
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as book_file:
+            self._data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._data) < HEADER.size or self._data[:len(MAGIC)] != MAGIC:
+            raise OpeningBookError(f"{path} is not an opening book")
+
+        (_, self.config_hash, strategy, self.code_length, self.nb_colours,
+         allow_duplicates, self.max_tries, self.nb_nodes) = HEADER.unpack_from(self._data)
+        self.strategy = strategy.rstrip(b'\0').decode('ascii')
+        self.allow_duplicates = bool(allow_duplicates)
+        self.nb_feedbacks = (self.code_length + 1) ** 2
+
+        expected_size = HEADER.size + 4 * self.nb_nodes * (1 + self.nb_feedbacks)
+        if len(self._data) != expected_size:
+            raise OpeningBookError(f"{path} is truncated")
+
+        self._guesses = np.frombuffer(self._data, dtype='<u4', count=self.nb_nodes, offset=HEADER.size)
+        self._children = np.frombuffer(self._data, dtype='<u4', offset=HEADER.size + 4 * self.nb_nodes,
+                                       count=self.nb_nodes * self.nb_feedbacks
+                                       ).reshape(self.nb_nodes, self.nb_feedbacks)
+
+
+    def guess(self, node):
+        """ Packed guess to play at a node
+        """
+        return int(self._guesses[node])
+
+
+    def child(self, node, places, colours):
+        """ Node reached after the feedback of the node's guess, or None
+        """
+        child = int(self._children[node, feedback_code(places, colours, self.code_length)])
+        return child or None
+
+
+    def lookup(self, history):
+        """ Return the next guess after the (packed guess, matching places,
+            matching colours) rows of a history, or None when the history
+            leaves the book.
+        """
+        node = 0
+        for guess, places, colours in history:
+            if guess != self._guesses[node]:
+                return None
+            node = self.child(node, places, colours)
+            if node is None:
+                return None
+        return self.guess(node)
+
+
+    def verify(self, codec, secrets):
+        """ Play the book against each packed secret. Return the number of
+            tries needed for each secret, raising OpeningBookError when one is
+            not solved within the maximum number of tries.
+        """
+        tries = np.zeros(len(secrets), dtype=np.uint8)
+        for index, secret in enumerate(secrets):
+            secret_digits = codec.digits(int(secret))
+            node = 0
+            for nb_tries in range(1, self.max_tries + 1):
+                guess = self.guess(node)
+                places, colours = codec.score(codec.digits(guess), secret_digits)
+                if places == self.code_length:
+                    tries[index] = nb_tries
+                    break
+                node = self.child(node, places, colours)
+                if node is None:
+                    break
+
+            if tries[index] == 0:
+                raise OpeningBookError(f"The secret code {codec.decode(int(secret))} is not solved "
+                                       f"within {self.max_tries} tries")
+        return tries
+
+
+    def close(self):
+        self._guesses = self._children = None
+        self._data.close()
+
+
+def build_opening_book(config, strategy='minimax'):
+    """ Explore every state reached by the solver. Return the guesses and the
+        children of the nodes as arrays.
+    """
+    core = MastermindCore(quiet=True)
+    core.configure(config.code_length, config.allow_duplicates, config.max_tries, config.colours)
+    solver = Solver(core, strategy)
+    code_length = config.code_length
+
+    guesses = []
+    children = []
+    # Nodes to explore, given by their index and the guesses leading to them
+    pending = [(0, [])]
+    guesses.append(0)
+    children.append(np.zeros((code_length + 1) ** 2, dtype=np.uint32))
+
+    while pending:
+        node, path = pending.pop()
+        core.reset_game(0)
+        for row in path:
+            core.history.append(*row)
+        solver.reset()
+
+        guess = solver.next_guess()
+        guesses[node] = guess
+        places, colours = core.score_many(guess, solver.candidates)
+        for feedback in np.unique(places.astype(np.int64) * (code_length + 1) + colours):
+            guess_places, guess_colours = divmod(int(feedback), code_length + 1)
+            # Winning feedbacks end the game, and the last try has no follow-up
+            if guess_places == code_length or len(path) + 1 >= config.max_tries:
+                continue
+
+            child = len(guesses)
+            guesses.append(0)
+            children.append(np.zeros((code_length + 1) ** 2, dtype=np.uint32))
+            children[node][feedback] = child
+            pending.append((child, path + [(guess, guess_places, guess_colours)]))
+
+    return np.array(guesses, dtype='<u4'), np.array(children, dtype='<u4')
+
+
+def save_opening_book(path, config, strategy, guesses, children):
+    """ Atomically write a book file
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(temp_path, 'wb') as book_file:
+        book_file.write(HEADER.pack(MAGIC, config.config_hash, strategy.encode('ascii'), config.code_length,
+                                    config.codec.nb_colours, config.allow_duplicates, config.max_tries,
+                                    len(guesses)))
+        book_file.write(guesses.tobytes())
+        book_file.write(children.tobytes())
+    os.replace(temp_path, path)
+
+
+def book_path(config, strategy, cache_dir=None):
+    return os.path.join(cache_dir or cache_directory(), f"opening_book_{config.config_hash:016x}_{strategy}.bin")
+
+
+def cached_opening_book(config, strategy='minimax'):
+    """ Return the opening book of a configuration if it is already loaded,
+        or None
+    """
+    return _books.get((config, strategy))
+
+
+def load_opening_book(config, strategy='minimax', cache_dir=None):
+    """ Return the opening book of a configuration, memory-mapped from the disk
+        cache, and built and verified first when it is not cached.
+    """
+    key = (config, strategy)
+    book = _books.get(key)
+    if book is not None:
+        return book
+
+    path = book_path(config, strategy, cache_dir)
+    try:
+        book = OpeningBook(path)
+        if book.config_hash != config.config_hash or book.strategy != strategy:
+            book = None
+    except (OSError, OpeningBookError):
+        book = None
+
+    if book is None:
+        logger.info("Building the %s opening book of %s", strategy, config)
+        guesses, children = build_opening_book(config, strategy)
+        save_opening_book(path, config, strategy, guesses, children)
+        book = OpeningBook(path)
+        try:
+            book.verify(config.codec, config.valid_codes)
+        except OpeningBookError:
+            # Do not leave a book unable to win in the cache
+            book.close()
+            os.remove(path)
+            raise
+
+    _books[key] = book
+    return book
+
+
+def main(args=None):
+    # Imported here as the simulation depends on this module
+    from mastermind.simulation import parse_config
+
+    parser = argparse.ArgumentParser(description="Build and verify the opening books of the solver.")
+    parser.add_argument('--config', action='append',
+                        help="Configuration as LENGTHxCOLOURS[:nodup], can be repeated (default: 4x7 and 4x6)")
+    parser.add_argument('--strategy', default='minimax')
+    parser.add_argument('--max-tries', type=int, default=10)
+    options = parser.parse_args(args)
+
+    for description in options.config or ['4x7', '4x6']:
+        config = GameConfig.get(**parse_config(description, options.max_tries))
+        book = load_opening_book(config, options.strategy)
+        tries = book.verify(config.codec, config.valid_codes)
+        print((f"{description} {options.strategy}: {book.nb_nodes} nodes, {len(tries)} secrets solved, "
+               f"mean tries {tries.mean():.3f}, max tries {tries.max()}"))
+
+
+if __name__ == '__main__':
+    main()
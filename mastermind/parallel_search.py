@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+"""
+Search of the solver's next guess spread over a pool of worker processes.
+
+The arrays a search reads are placed in shared memory blocks once: the score
+table when one is loaded (shared for as long as the search object lives), the
+candidates with their colour indices and counts, and the guesses to rate (for
+the duration of a search). The workers attach to the blocks by name, so the
+tasks only hold block names and a range of guesses, and each worker returns the
+best rate of its range along with the guesses reaching it. The ties are broken
+by the solver, which knows whether its candidates are only a sample.
+"""
+
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+
+from mastermind.score_table import code_digits
+from mastermind.score_table import colour_counts
+from mastermind.score_table import score_digits
+from mastermind.score_table import table_key
+from mastermind.solver import MAX_SEARCH_CELLS
+from mastermind.solver import count_partitions
+from mastermind.solver import rate_guesses
+
+import numpy as np
+
+
+# Searches smaller than this number of (guess, candidate) pairs stay in the
+# calling process, where they are faster than the round trip to the workers
+MIN_PARALLEL_CELLS = 1 << 20
+
+# Blocks attached by the current worker process, keyed by name
+_attached = {}
+
+
+def _share(array):
+    """ Copy an array into a new shared memory block. Return the block and the
+        description of the array sent to the workers.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(description):
+    """ Return the array described, attaching its block in the worker
+    """
+    name, shape, dtype = description
+    if name not in _attached:
+        block = shared_memory.SharedMemory(name=name)
+        _attached[name] = (block, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+    return _attached[name][1]
+
+
+def _detach_others(names):
+    """ Close the blocks of the previous searches
+    """
+    for name in [x for x in _attached if x not in names]:
+        block, array = _attached.pop(name)
+        # The block can only be closed once no array uses its buffer
+        del array
+        block.close()
+
+
+def _rate_range(arrays, start, stop, strategy, codec):
+    """ Rate the guesses of a range in a worker. Return the best rate of the
+        range and the guesses reaching it, in the order of the range.
+    """
+    _detach_others({x[0] for x in arrays.values() if x is not None})
+    guesses = _attach(arrays['guesses'])[start:stop]
+    candidates = _attach(arrays['candidates'])
+    table = _attach(arrays['table']) if arrays['table'] is not None else None
+    if table is None:
+        candidates_digits = _attach(arrays['candidates_digits'])
+        candidates_counts = _attach(arrays['candidates_counts'])
+
+    code_length = codec.code_length
+    best_rate = None
+    best_guesses = []
+    block = max(1, MAX_SEARCH_CELLS // len(candidates))
+    for block_start in range(0, len(guesses), block):
+        block_guesses = guesses[block_start:block_start + block]
+        if table is not None:
+            feedback = table[block_guesses[:, None], candidates[None, :]]
+        else:
+            places, colours = score_digits(code_digits(codec, block_guesses), candidates_digits,
+                                           codec.nb_colours, codes_counts=candidates_counts)
+            feedback = places.astype(np.int64) * (code_length + 1) + colours
+
+        rates = rate_guesses(count_partitions(feedback, code_length), strategy)
+        rate = float(rates.min())
+        if best_rate is None or rate < best_rate:
+            best_rate = rate
+            best_guesses = []
+        if rate == best_rate:
+            best_guesses.append(block_guesses[rates == rate])
+
+    return best_rate, np.concatenate(best_guesses)
+
+
+class ParallelSearch:
+    """ Pool of worker processes rating the guesses of solvers
+    """
+
+    def __init__(self, workers=None, min_cells=MIN_PARALLEL_CELLS):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_cells = min_cells
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Shared score tables, keyed by configuration
+        self._tables = {}
+
+
+    def best_guesses(self, core, pool, candidates, strategy):
+        """ Return the guesses of the pool with the best rate, in the order of
+            the pool, for the solver to break the ties.
+        """
+        blocks = []
+        try:
+            shared = [('guesses', np.asarray(pool, dtype=np.int64)),
+                      ('candidates', np.asarray(candidates, dtype=np.int64))]
+            arrays = {'table': self._shared_table(core)}
+            if arrays['table'] is None:
+                digits = code_digits(core.codec, candidates)
+                shared += [('candidates_digits', digits),
+                           ('candidates_counts', colour_counts(digits, core.codec.nb_colours))]
+
+            for name, array in shared:
+                block, arrays[name] = _share(array)
+                blocks.append(block)
+
+            # Several ranges per worker to even out their load
+            nb_tasks = min(len(pool), self.workers * 4)
+            bounds = np.linspace(0, len(pool), nb_tasks + 1).astype(np.int64)
+            futures = [self._executor.submit(_rate_range, arrays, int(start), int(stop), strategy, core.codec)
+                       for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+            results = [future.result() for future in futures]
+            best_rate = min(rate for rate, _ in results)
+            return np.concatenate([guesses for rate, guesses in results if rate == best_rate])
+
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+
+    def _shared_table(self, core):
+        if core.score_table is None:
+            return None
+
+        key = table_key(core.codec)
+        if key not in self._tables:
+            self._tables[key] = _share(np.asarray(core.score_table))
+        return self._tables[key][1]
+
+
+    def close(self):
+        self._executor.shutdown()
+        for block, _ in self._tables.values():
+            block.close()
+            block.unlink()
+        self._tables.clear()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
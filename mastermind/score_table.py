@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+"""
+Precomputed feedback of every (guess, secret) pair of a configuration.
+
+The table is a square uint8 array indexed by packed codes: table[guess, secret]
+holds the feedback of the guess against the secret, encoded by feedback_code().
+It is built lazily, kept in memory for the whole process and cached on disk so
+that later processes can memory-map it instead of building it again.
+
+The table covers every code of the configuration, including the ones using a
+colour more than once, since the player may submit such guesses even when the
+secret has no duplicates. It therefore does not depend on allow_duplicates and
+is shared by both variants of a configuration.
+"""
+
+
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Largest code space for which a table may be built (10^4 codes is 100 MB)
+MAX_TABLE_CODES = 10 ** 4
+
+# Number of cells computed at once when scoring arrays of codes
+_BUILD_CHUNK_CELLS = 1 << 22
+
+_tables = {}
+
+
+class ScoreTableTooLargeError(Exception):
+    pass
+
+
+def feedback_code(places, colours, code_length):
+    """ Encode the feedback of a guess into a single byte
+    """
+    return places * (code_length + 1) + colours
+
+
+def split_feedback_code(feedback, code_length):
+    """ Decode a feedback byte into the number of pegs at the correct position
+        and the number of pegs of the correct colour at a wrong position.
+    """
+    return divmod(int(feedback), code_length + 1)
+
+
+def all_code_digits(codec):
+    """ Return the colour indices of every code of the configuration, as an
+        array of shape (codec.size, code_length) ordered by packed value.
+    """
+    shape = (codec.nb_colours,) * codec.code_length
+    return np.indices(shape, dtype=np.uint8).reshape(codec.code_length, -1).T
+
+
+def colour_counts(digits, nb_colours):
+    """ Count the pegs of each colour for an array of codes given as colour
+        indices. Return an array of shape (nb_codes, nb_colours).
+    """
+    counts = np.empty((len(digits), nb_colours), dtype=np.uint8)
+    for colour in range(nb_colours):
+        counts[:, colour] = (digits == colour).sum(axis=1)
+    return counts
+
+
+def code_digits(codec, codes):
+    """ Return the colour indices of an array of packed codes, as an array of
+        shape (len(codes), code_length).
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    digits = np.empty((len(codes), codec.code_length), dtype=np.uint8)
+    for pos in range(codec.code_length - 1, -1, -1):
+        codes, digits[:, pos] = np.divmod(codes, codec.nb_colours)
+    return digits
+
+
+def score_digits(guesses, codes, nb_colours, guesses_counts=None, codes_counts=None):
+    """ Compute the feedback of every guess against every code, both given as
+        arrays of colour indices of shape (nb_guesses, code_length) and
+        (nb_codes, code_length).
+
+        The colour counts of the guesses and codes can be given when already
+        known. Return the number of pegs at the correct position and the number
+        of pegs of the correct colour at a wrong position, as two uint8 arrays
+        of shape (nb_guesses, nb_codes).
+    """
+    if guesses_counts is None:
+        guesses_counts = colour_counts(guesses, nb_colours)
+    if codes_counts is None:
+        codes_counts = colour_counts(codes, nb_colours)
+
+    places = np.empty((len(guesses), len(codes)), dtype=np.uint8)
+    colours = np.empty((len(guesses), len(codes)), dtype=np.uint8)
+
+    # Work on blocks of guesses to bound the size of the broadcast arrays
+    width = max(guesses.shape[1], nb_colours)
+    chunk = max(1, _BUILD_CHUNK_CELLS // (max(1, len(codes)) * width))
+    for start in range(0, len(guesses), chunk):
+        stop = min(start + chunk, len(guesses))
+        block_places = (guesses[start:stop, None, :] == codes[None, :, :]).sum(axis=2, dtype=np.uint8)
+        common = np.minimum(guesses_counts[start:stop, None, :],
+                            codes_counts[None, :, :]).sum(axis=2, dtype=np.uint8)
+        places[start:stop] = block_places
+        colours[start:stop] = common - block_places
+
+    return places, colours
+
+
+def build_score_table(codec):
+    """ Compute the feedback of every (guess, secret) pair of the codec's
+        configuration.
+    """
+    if codec.size > MAX_TABLE_CODES:
+        raise ScoreTableTooLargeError((f"The configuration has {codec.size} codes, "
+                                       f"score tables are limited to {MAX_TABLE_CODES} codes."))
+
+    if feedback_code(codec.code_length, 0, codec.code_length) > np.iinfo(np.uint8).max:
+        raise ScoreTableTooLargeError(f"Codes of {codec.code_length} pegs do not fit into a score table.")
+
+    digits = all_code_digits(codec)
+    counts = colour_counts(digits, codec.nb_colours)
+    places, colours = score_digits(digits, digits, codec.nb_colours, counts, counts)
+    return feedback_code(places, colours, codec.code_length)
+
+
+def cache_directory():
+    """ Directory where the score tables are cached, which can be overridden
+        with the MASTERMIND_CACHE_DIR environment variable.
+    """
+    default = os.path.join(os.path.expanduser('~'), '.cache', 'mastermind')
+    return os.environ.get('MASTERMIND_CACHE_DIR', default)
+
+
+def table_key(codec):
+    """ Identify the configuration of a score table
+    """
+    description = repr((codec.code_length, codec.colours))
+    return hashlib.sha1(description.encode('utf-8')).hexdigest()[:16]
+
+
+def load_score_table(codec, cache_dir=None):
+    """ Return the score table of the codec's configuration.
+
+        The table is looked up in memory first, then memory-mapped from the
+        disk cache, and built (then saved to the disk cache) as a last resort.
+    """
+    key = table_key(codec)
+    table = _tables.get(key)
+    if table is not None:
+        return table
+
+    path = os.path.join(cache_dir or cache_directory(), f"score_table_{key}.npy")
+    try:
+        table = np.load(path, mmap_mode='r')
+        if table.shape != (codec.size, codec.size):
+            table = None
+    except (OSError, ValueError):
+        table = None
+
+    if table is None:
+        logger.info("Building score table for %d codes", codec.size)
+        table = build_score_table(codec)
+        _save_table(path, table)
+
+    _tables[key] = table
+    return table
+
+
+def _save_table(path, table):
+    """ Atomically write a table to the disk cache. Failing to write the cache
+        is not an error, the table is simply rebuilt by the next process.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'wb') as table_file:
+            np.save(table_file, table)
+        os.replace(temp_path, path)
+    except OSError as error:
+        logger.warning("Unable to cache the score table to %s: %s", path, error)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+
+"""
+Asyncio game server hosting many concurrent Mastermind sessions.
+
+Clients connect over TCP or a Unix socket and exchange newline-delimited JSON
+messages. Each request is an object with an "op" field, an optional "id" echoed
+back in the response, and the parameters of the operation:
+
+ - new_game: start a new game, in a new session unless "session" is given.
+   Accepts the configure() parameters,
+ - configure: change the configuration of a session and start a new game,
+ - guess: submit a "guess" given as a list of colours,
+ - status: return the configuration and the guesses of the session's game,
+ - close: delete the session.
+
+Responses hold "ok": true and the operation's results, or "ok": false with the
+"error" message and its "type". Sessions idle for longer than the TTL are
+evicted, and the number of sessions is capped, as well as the size of the games
+clients can configure.
+"""
+
+
+from collections import OrderedDict
+import argparse
+import asyncio
+import json
+import logging
+import secrets
+import time
+
+from mastermind.mastermind_core import BadColoursSetError
+from mastermind.mastermind_core import BadGuessLengthError
+from mastermind.mastermind_core import MastermindCore
+from mastermind.mastermind_core import MaxTriesReachedError
+from mastermind.mastermind_core import UnknownColourError
+from mastermind.metrics import Metrics
+
+
+logger = logging.getLogger(__name__)
+
+CONFIGURE_PARAMETERS = ('code_length', 'allow_duplicates', 'max_tries', 'colours_set')
+
+# Largest games the clients can configure, well below the limits of GameConfig
+# so that a single request cannot hold the event loop or much memory
+MAX_CODE_LENGTH = 12
+MAX_TRIES = 50
+MAX_COLOURS = 32
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class TooManySessionsError(Exception):
+    pass
+
+
+class UnknownSessionError(Exception):
+    pass
+
+
+class Session:
+    """ A game hosted by the server
+    """
+
+    __slots__ = ('session_id', 'core', 'last_access', 'game_over', 'won')
+
+    def __init__(self, session_id, now):
+        self.session_id = session_id
+        self.core = MastermindCore(quiet=True)
+        self.last_access = now
+        self.game_over = False
+        self.won = False
+
+
+    def new_game(self):
+        self.core.reset_game()
+        self.game_over = False
+        self.won = False
+
+
+class SessionTable:
+    """ Sessions keyed by their id, ordered from the least to the most recently
+        used one.
+    """
+
+    def __init__(self, max_sessions=10000, ttl=600, clock=time.monotonic):
+        self._sessions = OrderedDict()
+        self._max_sessions = max_sessions
+        self._ttl = ttl
+        self._clock = clock
+
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+    def create(self):
+        """ Create a new session. Raise TooManySessionsError when the table is
+            full, once the idle sessions have been evicted.
+        """
+        if len(self._sessions) >= self._max_sessions:
+            self.evict_expired()
+            if len(self._sessions) >= self._max_sessions:
+                raise TooManySessionsError(f"The server is limited to {self._max_sessions} sessions")
+
+        session_id = secrets.token_hex(8)
+        session = Session(session_id, self._clock())
+        self._sessions[session_id] = session
+        return session
+
+
+    def get(self, session_id):
+        """ Return a session and mark it as used
+        """
+        session = self._sessions.get(session_id)
+        now = self._clock()
+        if session is None or now - session.last_access > self._ttl:
+            raise UnknownSessionError(f"Unknown or expired session: {session_id}")
+
+        session.last_access = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+
+    def remove(self, session_id):
+        if self._sessions.pop(session_id, None) is None:
+            raise UnknownSessionError(f"Unknown or expired session: {session_id}")
+
+
+    def evict_expired(self):
+        """ Delete the sessions idle for longer than the TTL. Return the number
+            of evicted sessions.
+        """
+        deadline = self._clock() - self._ttl
+        evicted = 0
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_access >= deadline:
+                break
+            del self._sessions[session.session_id]
+            evicted += 1
+        return evicted
+
+
+class GameServer:
+    """ Serve the JSON protocol to the clients, on a single event loop
+    """
+
+    def __init__(self, sessions=None, metrics=None):
+        self.sessions = sessions if sessions is not None else SessionTable()
+        # Optional Metrics instrumenting the cores of the sessions
+        self.metrics = metrics
+        self._operations = {'new_game': self.new_game,
+                            'configure': self.configure,
+                            'guess': self.guess,
+                            'status': self.status,
+                            'close': self.close}
+
+
+    def handle_request(self, request):
+        """ Process a decoded request and return the response object
+        """
+        response = {}
+        try:
+            if not isinstance(request, dict):
+                raise ProtocolError("Requests must be JSON objects")
+            if 'id' in request:
+                response['id'] = request['id']
+
+            operation = self._operations.get(request.get('op'))
+            if operation is None:
+                raise ProtocolError(f"Unknown operation: {request.get('op')}")
+
+            response.update(operation(request))
+            response['ok'] = True
+
+        except (ProtocolError, TooManySessionsError, UnknownSessionError, BadColoursSetError,
+                BadGuessLengthError, UnknownColourError, TypeError, ValueError) as error:
+            response['ok'] = False
+            response['error'] = str(error)
+            response['type'] = type(error).__name__
+
+        except Exception:
+            # Never leave the client without a response
+            logger.exception("Failed to process the request %r", request)
+            response['ok'] = False
+            response['error'] = "Internal server error"
+            response['type'] = 'InternalError'
+
+        return response
+
+
+    def handle_line(self, line):
+        """ Process a raw request line and return the encoded response line
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            request = None
+            response = {'ok': False, 'error': f"Invalid JSON: {error}", 'type': 'ProtocolError'}
+        if request is not None:
+            response = self.handle_request(request)
+        return json.dumps(response).encode('utf-8') + b'\n'
+
+
+    def new_game(self, request):
+        if 'session' in request:
+            session = self.sessions.get(request['session'])
+        else:
+            session = self.sessions.create()
+            if self.metrics is not None:
+                self.metrics.instrument(session.core)
+
+        try:
+            self._configure_session(session, request)
+        except Exception:
+            if 'session' not in request:
+                self.sessions.remove(session.session_id)
+            raise
+
+        return self._describe(session)
+
+
+    def configure(self, request):
+        session = self._session(request)
+        self._configure_session(session, request)
+        return self._describe(session)
+
+
+    def guess(self, request):
+        session = self._session(request)
+        if session.game_over:
+            raise ProtocolError("The game is over, start a new game")
+
+        guess = request.get('guess')
+        if not isinstance(guess, list):
+            raise ProtocolError("The guess must be a list of colours")
+
+        core = session.core
+        try:
+            session.won = core.add_guess(guess)
+            session.game_over = session.won
+        except MaxTriesReachedError:
+            session.game_over = True
+
+        response = {'session': session.session_id,
+                    'places': core.last_row_correct_positions,
+                    'colours': core.last_row_correct_colours,
+                    'tries': core.nb_player_guesses,
+                    'won': session.won,
+                    'game_over': session.game_over}
+        if session.game_over:
+            response['secret_code'] = core.secret_code
+        return response
+
+
+    def status(self, request):
+        session = self._session(request)
+        response = self._describe(session)
+        response['guesses'] = session.core.player_guesses
+        response['won'] = session.won
+        response['game_over'] = session.game_over
+        if session.game_over:
+            response['secret_code'] = session.core.secret_code
+        return response
+
+
+    def close(self, request):
+        self.sessions.remove(self._session_id(request))
+        return {}
+
+
+    def _session_id(self, request):
+        if 'session' not in request:
+            raise ProtocolError("The request has no session")
+        return request['session']
+
+
+    def _session(self, request):
+        return self.sessions.get(self._session_id(request))
+
+
+    def _configure_session(self, session, request):
+        parameters = {x: request[x] for x in CONFIGURE_PARAMETERS if x in request}
+        self._check_limits(parameters)
+        if parameters:
+            session.core.configure(**parameters)
+        session.new_game()
+
+
+    def _check_limits(self, parameters):
+        """ Reject the games larger than the server allows
+        """
+        for name, limit in (('code_length', MAX_CODE_LENGTH), ('max_tries', MAX_TRIES)):
+            value = parameters.get(name)
+            if isinstance(value, int) and value > limit:
+                raise ProtocolError(f"The {name} is limited to {limit} by the server, got: {value}")
+
+        colours_set = parameters.get('colours_set')
+        if colours_set is not None:
+            if not isinstance(colours_set, list):
+                raise ProtocolError("The colours set must be a list of colours")
+            if len(colours_set) > MAX_COLOURS:
+                raise ProtocolError(f"The colours set is limited to {MAX_COLOURS} colours by the server")
+
+
+    def _describe(self, session):
+        core = session.core
+        return {'session': session.session_id,
+                'code_length': core.code_length,
+                'allow_duplicates': core.allow_duplicates,
+                'max_tries': core.max_tries,
+                'colours_set': list(core.codec.colours),
+                'tries': core.nb_player_guesses}
+
+
+    async def handle_client(self, reader, writer):
+        """ Serve the requests of a connected client until it disconnects
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line is longer than the stream limit
+                    writer.write(b'{"ok": false, "error": "Request too long", "type": "ProtocolError"}\n')
+                    break
+
+                if not line:
+                    break
+                if line.strip():
+                    writer.write(self.handle_line(line))
+                    await writer.drain()
+
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+    async def evict_periodically(self, period):
+        while True:
+            await asyncio.sleep(period)
+            evicted = self.sessions.evict_expired()
+            if evicted and logger.isEnabledFor(logging.INFO):
+                logger.info("Evicted %d idle sessions, %d left", evicted, len(self.sessions))
+
+
+    async def serve(self, host='127.0.0.1', port=7777, unix_path=None, eviction_period=10):
+        """ Serve clients until cancelled
+        """
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+
+        eviction = asyncio.ensure_future(self.evict_periodically(eviction_period))
+        try:
+            async with server:
+                logger.info("Serving on %s", ', '.join(str(x.getsockname()) for x in server.sockets))
+                await server.serve_forever()
+        finally:
+            eviction.cancel()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Host Mastermind games over newline-delimited JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--unix', help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument('--max-sessions', type=int, default=10000)
+    parser.add_argument('--ttl', type=float, default=600, help="Idle time before a session is evicted, in seconds")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Serve the Prometheus metrics of the games over HTTP on this port")
+    options = parser.parse_args(args)
+
+    logging.basicConfig(level=logging.INFO)
+    metrics = None
+    if options.metrics_port is not None:
+        metrics = Metrics()
+        metrics.serve_prometheus(options.host, options.metrics_port)
+
+    server = GameServer(SessionTable(options.max_sessions, options.ttl), metrics)
+    try:
+        asyncio.run(server.serve(options.host, options.port, options.unix,
+                                 eviction_period=max(1, options.ttl / 2)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
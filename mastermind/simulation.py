@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+
+"""
+Headless batch simulation of Mastermind games.
+
+Games are split into chunks played by a pool of worker processes. Each chunk is
+seeded from the simulation seed and its own index, so results do not depend on
+the number of workers or on the scheduling of the chunks. The statistics of the
+chunks are merged as soon as they complete, and only a bounded number of chunks
+are in flight at once, so the memory use does not grow with the number of
+games.
+"""
+
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+import argparse
+import json
+import os
+import random
+import time
+
+from mastermind.candidates import random_codes
+from mastermind.export import FORMATS
+from mastermind.export import GameExporter
+from mastermind.mastermind_core import MastermindCore
+from mastermind.mastermind_core import MaxTriesReachedError
+from mastermind.opening_book import load_opening_book
+from mastermind.solver import STRATEGIES
+from mastermind.solver import Solver
+
+import numpy as np
+
+
+PLAYER_STRATEGIES = ('random',) + STRATEGIES
+
+# Colours of the pegs available in the resources, completed with generated
+# names for larger colour sets
+PEG_COLOURS = ['Green', 'Yellow', 'Red', 'Orange', 'Blue', 'Black', 'White', 'Brown']
+
+
+def colours_set(nb_colours):
+    """ Return a colours set of the requested size
+    """
+    extra_colours = [f'Colour{i}' for i in range(len(PEG_COLOURS), nb_colours)]
+    return (PEG_COLOURS + extra_colours)[:nb_colours]
+
+
+def parse_config(description, max_tries):
+    """ Parse a configuration given as LENGTHxCOLOURS, optionally followed by
+        ':nodup' to forbid duplicates. Example: 4x6:nodup
+    """
+    shape, _, option = description.partition(':')
+    code_length, nb_colours = (int(x) for x in shape.lower().split('x'))
+    return {'code_length': code_length,
+            'allow_duplicates': option != 'nodup',
+            'max_tries': max_tries,
+            'colours_set': colours_set(nb_colours)}
+
+
+class SimulationStats:
+    """ Aggregated results of simulated games, which can be merged together
+    """
+
+    def __init__(self, max_tries):
+        self.games = 0
+        self.wins = 0
+        # Number of games won with each number of tries (index 0 is unused)
+        self.tries_histogram = [0] * (max_tries + 1)
+
+
+    def add_game(self, won, nb_tries):
+        self.games += 1
+        if won:
+            self.wins += 1
+            self.tries_histogram[nb_tries] += 1
+
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins += other.wins
+        for tries, count in enumerate(other.tries_histogram):
+            self.tries_histogram[tries] += count
+
+
+    @property
+    def win_rate(self):
+        return self.wins / self.games if self.games else 0.0
+
+
+    @property
+    def mean_tries(self):
+        """ Average number of tries of the won games
+        """
+        total = sum(tries * count for tries, count in enumerate(self.tries_histogram))
+        return total / self.wins if self.wins else 0.0
+
+
+    def as_dict(self):
+        return {'games': self.games,
+                'wins': self.wins,
+                'win_rate': self.win_rate,
+                'mean_tries': self.mean_tries,
+                'tries_histogram': {tries: count for tries, count in enumerate(self.tries_histogram)
+                                    if count > 0}}
+
+
+def make_player(core, strategy, rng, book=None):
+    """ Return a function that plays the current game of the core until it is
+        over, and returns whether the secret code has been found. Solvers
+        follow the opening book when given.
+    """
+    if strategy != 'random':
+        solver = Solver(core, strategy, book=book)
+
+        def play_solver():
+            solver.reset()
+            return solver.play()
+
+        return play_solver
+
+    # Draw the guesses of each game at once, rather than listing the codes of
+    # configurations too large to hold in memory
+    generator = np.random.default_rng(rng.getrandbits(64))
+
+    def play_random():
+        codes = random_codes(core.codec, core.allow_duplicates, core.max_tries, generator)
+        for code in codes:
+            try:
+                if core.add_guess(core.codec.decode(int(code))):
+                    return True
+            except MaxTriesReachedError:
+                return False
+        return False
+
+    return play_random
+
+
+def play_chunk(config, strategy, seed, nb_games, export_dir=None, export_format=None, use_opening_book=False):
+    """ Play a chunk of games in a worker process, exporting them to
+        export_dir when given
+    """
+    core = MastermindCore(quiet=True, seed=seed)
+    core.configure(**config)
+    book = None
+    if use_opening_book and strategy != 'random':
+        book = load_opening_book(core.config, strategy)
+    player = make_player(core, strategy, random.Random(seed), book)
+
+    exporter = None
+    if export_dir is not None:
+        # Name the part files after the chunk so that the workers never share one
+        prefix = f"{core.config_hash:016x}-{strategy}-{str(seed).replace(':', '-')}"
+        exporter = GameExporter(export_dir, export_format, prefix=prefix)
+
+    stats = SimulationStats(core.max_tries)
+    for secret in core.generate_secret_codes(nb_games):
+        core.reset_game(int(secret))
+        won = player()
+        stats.add_game(won, core.nb_player_guesses)
+        if exporter is not None:
+            exporter.add_game(core)
+
+    if exporter is not None:
+        exporter.close()
+
+    return stats
+
+
+def simulate(config, strategy='minimax', nb_games=1000, seed=0, workers=None, chunk_size=1000,
+             export_dir=None, export_format=None, use_opening_book=False):
+    """ Play games in a pool of worker processes and return their aggregated
+        statistics along with the elapsed time. The games are exported to
+        export_dir when given, by the workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    if use_opening_book and strategy != 'random':
+        # Build the book once, the workers load it from the disk cache
+        core = MastermindCore(quiet=True)
+        core.configure(**config)
+        load_opening_book(core.config, strategy)
+
+    nb_chunks = (nb_games + chunk_size - 1) // chunk_size
+    stats = SimulationStats(config['max_tries'])
+    start_time = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in range(nb_chunks):
+            # Bound the number of chunks in flight, merging results as they come
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.merge(future.result())
+
+            games = min(chunk_size, nb_games - chunk * chunk_size)
+            pending.add(executor.submit(play_chunk, config, strategy, f"{seed}:{chunk}", games,
+                                         export_dir, export_format, use_opening_book))
+
+        for future in pending:
+            stats.merge(future.result())
+
+    return stats, time.perf_counter() - start_time
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Simulate Mastermind games and report statistics.")
+    parser.add_argument('--config', action='append',
+                        help="Configuration as LENGTHxCOLOURS[:nodup], can be repeated (default: 4x7)")
+    parser.add_argument('--strategy', choices=PLAYER_STRATEGIES, default='minimax')
+    parser.add_argument('--games', type=int, default=1000, help="Number of games per configuration")
+    parser.add_argument('--max-tries', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Number of games per task")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+    parser.add_argument('--opening-book', action='store_true',
+                        help="Play the solver's precomputed decision tree, built on first use")
+    parser.add_argument('--export', metavar='DIR', help="Export the played games to this directory")
+    parser.add_argument('--export-format', choices=FORMATS, default=None,
+                        help="Format of the exported games (default: parquet if pyarrow is installed, else npz)")
+    options = parser.parse_args(args)
+
+    results = []
+    for description in options.config or ['4x7']:
+        config = parse_config(description, options.max_tries)
+        stats, elapsed = simulate(config, options.strategy, options.games, options.seed,
+                                  options.workers, options.chunk_size,
+                                  options.export, options.export_format, options.opening_book)
+        result = {'config': description, 'strategy': options.strategy,
+                  'elapsed': elapsed, 'games_per_second': stats.games / elapsed}
+        result.update(stats.as_dict())
+        results.append(result)
+
+        if not options.json:
+            print((f"{description} {options.strategy}: {stats.games} games, "
+                   f"win rate {stats.win_rate:.2%}, mean tries {stats.mean_tries:.3f}, "
+                   f"{result['games_per_second']:.0f} games/s"))
+            print(f"  tries histogram: {result['tries_histogram']}")
+
+    if options.json:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+
+"""
+Automatic solver playing against a MastermindCore game.
+
+The solver keeps the array of codes that are still consistent with the
+feedback received so far, prunes it incrementally each time a guess is added
+to the game, and chooses its next guess using one of the following heuristics:
+
+ - minimax: Knuth's algorithm, minimise the size of the largest group of
+   candidates left after the guess,
+ - expected_size: minimise the expected number of candidates left,
+ - entropy: maximise the information brought by the feedback.
+
+Only one guess per class of equivalent guesses is rated, see
+mastermind.symmetry.
+
+The codes of large configurations are never listed in full: the candidates are
+enumerated with mastermind.candidates once few enough of them are left, and
+until then the guesses are rated against a random sample of the candidates.
+The representatives of the guesses are generated rather than selected among
+all the codes.
+"""
+
+
+from itertools import islice
+
+from mastermind.candidates import consistent_blocks
+from mastermind.candidates import consistent_mask
+from mastermind.candidates import find_consistent_code
+from mastermind.candidates import sample_consistent_codes
+from mastermind.mastermind_core import MaxTriesReachedError
+from mastermind.score_table import MAX_TABLE_CODES
+from mastermind.symmetry import canonical_guesses
+from mastermind.symmetry import canonical_mask
+
+import numpy as np
+
+
+STRATEGIES = ('minimax', 'expected_size', 'entropy')
+
+# Largest number of (guess, candidate) pairs scored to choose a guess
+MAX_SEARCH_CELLS = 1 << 24
+
+# Largest configuration whose codes are listed in full
+MAX_LISTED_CODES = 1 << 22
+# Largest number of candidates listed in larger configurations, and number of
+# candidates sampled when there are more
+MAX_LISTED_CANDIDATES = 1 << 16
+SAMPLE_SIZE = 1 << 12
+# Largest number of representatives generated for a guess pool
+MAX_GENERATED_GUESSES = 1 << 16
+
+# Best first guess of each configuration, which is the costliest to compute
+_first_guesses = {}
+
+
+class UnknownStrategyError(Exception):
+    pass
+
+
+class SearchCancelledError(Exception):
+    pass
+
+
+def partition_sizes(core, guesses, candidates):
+    """ Count, for each guess, how many candidates give each feedback. Return
+        an array of shape (len(guesses), number of feedbacks).
+    """
+    places, colours = core.score_matrix(guesses, candidates)
+    return count_partitions(places.astype(np.int64) * (core.code_length + 1) + colours, core.code_length)
+
+
+def count_partitions(feedback, code_length):
+    """ Count, for each row of an array of feedback codes, how many times each
+        feedback occurs. Return an array of shape (len(feedback), number of
+        feedbacks).
+    """
+    nb_feedbacks = (code_length + 1) ** 2
+    nb_guesses = len(feedback)
+
+    # Offset the feedback of each guess so a single bincount fills all rows
+    feedback = feedback + np.arange(nb_guesses, dtype=np.int64)[:, None] * nb_feedbacks
+    sizes = np.bincount(feedback.ravel(), minlength=nb_guesses * nb_feedbacks)
+    return sizes.reshape(nb_guesses, nb_feedbacks)
+
+
+def rate_guesses(sizes, strategy):
+    """ Rate each guess from the sizes of the partitions of the candidates it
+        produces. The lower the rate, the better the guess.
+    """
+    if strategy == 'minimax':
+        return sizes.max(axis=1).astype(np.float64)
+
+    nb_candidates = sizes.sum(axis=1, keepdims=True)
+    if strategy == 'expected_size':
+        return (sizes.astype(np.float64) ** 2).sum(axis=1) / nb_candidates[:, 0]
+
+    if strategy == 'entropy':
+        probabilities = sizes / nb_candidates
+        with np.errstate(divide='ignore', invalid='ignore'):
+            information = np.where(sizes > 0, probabilities * np.log2(probabilities), 0.0)
+        return information.sum(axis=1)
+
+    raise UnknownStrategyError(f"Unknown strategy: {strategy}. Expected one of: {', '.join(STRATEGIES)}.")
+
+
+class Solver:
+    """ Find the secret code of a MastermindCore game
+    """
+
+    def __init__(self, core, strategy='minimax', use_score_table=True, book=None, parallel=None,
+                 cancel_event=None):
+        if strategy not in STRATEGIES:
+            raise UnknownStrategyError(f"Unknown strategy: {strategy}. Expected one of: {', '.join(STRATEGIES)}.")
+
+        self._core = core
+        self._strategy = strategy
+        self._use_score_table = use_score_table
+        # Optional OpeningBook of the configuration, followed while the game
+        # stays in it
+        self._book = book
+        # Optional ParallelSearch rating the guesses of large searches
+        self._parallel = parallel
+        # Optional threading.Event, set from another thread to stop the
+        # search in progress with a SearchCancelledError
+        self._cancel_event = cancel_event
+        self.reset()
+
+
+    @property
+    def strategy(self):
+        return self._strategy
+
+
+    @property
+    def candidates(self):
+        """ Packed codes that are consistent with the guesses of the game. They
+            are listed on demand when there are too many to keep, which can be
+            costly.
+        """
+        self.update()
+        if self._candidates is None:
+            return np.concatenate([np.empty(0, dtype=np.int64), *self._consistent_blocks()])
+        return self._candidates
+
+
+    @property
+    def nb_candidates(self):
+        self.update()
+        if self._candidates is not None:
+            return len(self._candidates)
+        if self._nb_seen_guesses == 0:
+            return self._config.nb_valid_codes
+
+        nb_candidates = 0
+        for block in self._consistent_blocks():
+            self._check_cancelled()
+            nb_candidates += len(block)
+        return nb_candidates
+
+
+    def reset(self):
+        """ Forget the guesses of the previous game. Must be called when a new
+            game starts on the core.
+        """
+        core = self._core
+        self._config = core.config
+        self._codec = core.codec
+        self._allow_duplicates = core.allow_duplicates
+        if self._use_score_table and core.score_table is None and self._codec.size <= MAX_TABLE_CODES:
+            core.load_score_table()
+
+        # Shared by all the games of the configuration, None when there are
+        # too many codes to list
+        self._all_codes = self._config.valid_codes if self._config.size <= MAX_LISTED_CODES else None
+        # None while there are too many candidates to list
+        self._candidates = self._all_codes
+        self._nb_seen_guesses = 0
+
+
+    def update(self):
+        """ Remove the candidates that are not consistent with the guesses
+            added to the game since the last update.
+        """
+        core = self._core
+        if core.config is not self._config or core.nb_player_guesses < self._nb_seen_guesses:
+            self.reset()
+
+        new_guesses = core.history[self._nb_seen_guesses:]
+        if self._candidates is None:
+            if new_guesses:
+                self._candidates = self._list_candidates()
+        else:
+            for guess, places, colours in new_guesses:
+                guess_places, guess_colours = core.score_many(guess, self._candidates)
+                self._candidates = self._candidates[(guess_places == places) & (guess_colours == colours)]
+
+        self._nb_seen_guesses = core.nb_player_guesses
+
+
+    def _consistent_blocks(self):
+        return consistent_blocks(self._codec, self._core.history, self._allow_duplicates)
+
+
+    def _list_candidates(self):
+        """ List the candidates of a large configuration, or return None when
+            there are more than MAX_LISTED_CANDIDATES
+        """
+        blocks = [np.empty(0, dtype=np.int64)]
+        nb_candidates = 0
+        for block in self._consistent_blocks():
+            self._check_cancelled()
+            blocks.append(block)
+            nb_candidates += len(block)
+            if nb_candidates > MAX_LISTED_CANDIDATES:
+                return None
+        return np.concatenate(blocks)
+
+
+    def next_guess(self):
+        """ Choose the next guess to play, as a packed code
+        """
+        if self._book is not None and self._book.config_hash == self._core.config_hash:
+            guess = self._book.lookup(self._core.history)
+            if guess is not None:
+                return guess
+
+        self.update()
+        candidates = self._candidates
+
+        # With two candidates left, or on the last try, only a candidate can win
+        last_try = self._core.max_tries - self._core.nb_player_guesses <= 1
+        if candidates is None and last_try:
+            return find_consistent_code(self._codec, self._core.history, self._allow_duplicates)
+        if candidates is not None and (len(candidates) <= 2 or last_try):
+            return int(candidates[0])
+
+        # The first guess only depends on the shape of the configuration
+        first_guess_key = None
+        if self._nb_seen_guesses == 0:
+            first_guess_key = (self._codec.code_length, self._codec.nb_colours,
+                               self._allow_duplicates, self._strategy)
+            if first_guess_key in _first_guesses:
+                return _first_guesses[first_guess_key]
+
+        if candidates is None:
+            # Seeded, so that the solver stays deterministic
+            generator = np.random.default_rng(self._nb_seen_guesses)
+            candidates = sample_consistent_codes(self._codec, self._core.history, self._allow_duplicates,
+                                                 SAMPLE_SIZE, generator)
+            if len(candidates) == 0:
+                return find_consistent_code(self._codec, self._core.history, self._allow_duplicates)
+
+        guess = self._search(self._guess_pool(candidates), candidates)
+
+        if first_guess_key is not None:
+            _first_guesses[first_guess_key] = guess
+        return guess
+
+
+    def hint(self):
+        """ Suggest the next guess to play, as a list of colours
+        """
+        return self._codec.decode(self.next_guess())
+
+
+    def play(self):
+        """ Play the current game until it is over. Return True if the secret
+            code has been found within the maximum number of tries.
+        """
+        while True:
+            try:
+                if self._core.add_guess(self.hint()):
+                    return True
+            except MaxTriesReachedError:
+                return False
+
+
+    def _guess_pool(self, candidates):
+        """ Select the codes among which the next guess is chosen, keeping one
+            guess per equivalence class
+        """
+        played = [guess for guess, _, _ in self._core.history]
+        nb_candidates = len(candidates)
+        max_guesses = MAX_SEARCH_CELLS // nb_candidates
+        if self._all_codes is not None:
+            guesses = self._all_codes[canonical_mask(self._codec, self._all_codes, played)]
+        else:
+            # Generated in increasing order, as selected from all the codes
+            max_guesses = min(max_guesses, MAX_GENERATED_GUESSES)
+            guesses = np.fromiter(islice(canonical_guesses(self._codec, played, self._allow_duplicates),
+                                         max_guesses + 1), dtype=np.int64)
+        if len(guesses) <= max_guesses:
+            return guesses
+
+        candidates = candidates[canonical_mask(self._codec, candidates, played)]
+        if len(candidates) * nb_candidates <= MAX_SEARCH_CELLS:
+            return candidates
+
+        # Evenly sample the candidates to stay within the search budget
+        nb_guesses = max(1, MAX_SEARCH_CELLS // nb_candidates)
+        return candidates[np.linspace(0, len(candidates) - 1, nb_guesses).astype(np.int64)]
+
+
+    def _check_cancelled(self):
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            raise SearchCancelledError("The search has been cancelled")
+
+
+    def _search(self, pool, candidates):
+        """ Return the best guess of the pool for the given candidates
+        """
+        if self._parallel is not None and len(pool) * len(candidates) >= self._parallel.min_cells:
+            best = self._parallel.best_guesses(self._core, pool, candidates, self._strategy)
+        else:
+            block = max(1, MAX_SEARCH_CELLS // len(candidates))
+            rates = []
+            for start in range(0, len(pool), block):
+                self._check_cancelled()
+                rates.append(rate_guesses(partition_sizes(self._core, pool[start:start + block], candidates),
+                                          self._strategy))
+            rates = np.concatenate(rates)
+            best = pool[rates == rates.min()]
+
+        # Among the best guesses, prefer the ones that may win, then the lowest code
+        if self._candidates is None:
+            # Only a sample of the candidates is known
+            best_candidates = best[consistent_mask(self._codec, self._core.history, best)]
+        else:
+            best_candidates = best[np.isin(best, candidates)]
+        if len(best_candidates) > 0:
+            return int(best_candidates[0])
+        return int(best[0])
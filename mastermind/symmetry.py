@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+"""
+Symmetries of the code space, used to reduce the guesses worth evaluating.
+
+Colours that have not been played in any guess yet are indistinguishable: the
+feedback received so far is the same whatever the secret uses among them.
+Exchanging such free colours in a guess gives an equivalent guess, splitting
+the candidates into groups of the same sizes, so only one guess per
+equivalence class needs to be rated. Before the first guess every colour is
+free and the positions are interchangeable too, so a first guess is only
+characterised by how many pegs of each colour it has.
+
+The representative of a class is its lowest packed code: the free colours it
+uses are the lowest free ones, appearing in increasing order. Choosing the
+lowest code among the best representatives thus gives the same guess as
+choosing it among all the codes.
+"""
+
+
+import numpy as np
+
+from mastermind.score_table import code_digits
+
+
+def used_colours(codec, guesses):
+    """ Return the sorted indices of the colours played in the packed guesses
+    """
+    used = set()
+    for guess in guesses:
+        used.update(codec.digits(int(guess)))
+    return sorted(used)
+
+
+def colour_classes(codec, guesses):
+    """ Split the colour indices into equivalence classes given the packed
+        guesses played: each played colour is alone in its class, and the
+        free colours form a single class.
+    """
+    used = used_colours(codec, guesses)
+    free = tuple(x for x in range(codec.nb_colours) if x not in set(used))
+    return [(x,) for x in used] + ([free] if free else [])
+
+
+def _partitions(total, max_part, max_parts):
+    """ Yield the partitions of total in non-increasing parts
+    """
+    if total == 0:
+        yield ()
+        return
+    if max_parts == 0:
+        return
+    for part in range(min(total, max_part), 0, -1):
+        for rest in _partitions(total - part, part, max_parts - 1):
+            yield (part,) + rest
+
+
+def first_guesses(codec, allow_duplicates=True):
+    """ Yield the representatives of the first guesses, as packed codes in
+        increasing order: the most frequent colours come first, the lowest
+        colours being the most frequent.
+    """
+    max_part = codec.code_length if allow_duplicates else 1
+    for partition in _partitions(codec.code_length, max_part, codec.nb_colours):
+        yield codec.pack_digits([colour for colour, count in enumerate(partition) for _ in range(count)])
+
+
+def canonical_guesses(codec, guesses, allow_duplicates=True):
+    """ Yield the representatives of the guesses given the packed guesses
+        already played, as packed codes in increasing order.
+    """
+    if len(guesses) == 0:
+        yield from first_guesses(codec, allow_duplicates)
+        return
+
+    used = used_colours(codec, guesses)
+    free = [x for x in range(codec.nb_colours) if x not in set(used)]
+    code_length = codec.code_length
+    digits = [0] * code_length
+
+    def fill(pos, nb_free):
+        if pos == code_length:
+            yield codec.pack_digits(digits)
+            return
+
+        # Any played colour, the free colours already used, and the next one
+        choices = sorted(used + free[:nb_free + 1])
+        for colour in choices:
+            if not allow_duplicates and colour in digits[:pos]:
+                continue
+            digits[pos] = colour
+            is_new = nb_free < len(free) and colour == free[nb_free]
+            yield from fill(pos + 1, nb_free + 1 if is_new else nb_free)
+
+    yield from fill(0, 0)
+
+
+def canonical_mask(codec, codes, guesses):
+    """ Tell which codes of an array of packed codes are the representatives
+        of their class, given the packed guesses already played
+    """
+    used = used_colours(codec, guesses)
+
+    # Rank of each free colour, -1 for the played ones
+    ranks = np.full(codec.nb_colours, -1, dtype=np.int16)
+    free = [x for x in range(codec.nb_colours) if x not in set(used)]
+    ranks[free] = np.arange(len(free))
+
+    code_ranks = ranks[code_digits(codec, codes)]
+    # Highest rank of the free colours met before each peg
+    seen = np.maximum.accumulate(code_ranks, axis=1)
+    seen = np.concatenate([np.full((len(code_ranks), 1), -1, dtype=np.int16), seen[:, :-1]], axis=1)
+    mask = (code_ranks <= seen + 1).all(axis=1)
+
+    if len(guesses) == 0:
+        first = np.fromiter(first_guesses(codec, allow_duplicates=True), dtype=np.int64)
+        mask &= np.isin(codes, first)
+    return mask
@@ -0,0 +1,5 @@
+from mastermind.simulation import main
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,9 @@
 from mastermind.mastermind_core import MastermindCore
+from mastermind.mastermind_core import BadGuessLengthError
+from mastermind.mastermind_core import MaxTriesReachedError
+from mastermind.mastermind_core import UnknownColourError
+
+import pytest
 
 
 def test_add_valid_guesses():
@@ -13,21 +18,21 @@ def test_add_valid_guesses():
         code_length = 4,
         colours_set = ['Red', 'Green', 'Blue', 'Yellow']
     )
-    mastermind._secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
 
     ret = mastermind.add_guess(guess1)
     assert ret == False
     assert mastermind.nb_player_guesses == 1
-    assert mastermind._player_guesses[0]['guess'] == guess1
-    assert mastermind._player_guesses[0]['matching_places'] == 1
-    assert mastermind._player_guesses[0]['matching_colours'] == 2
+    assert mastermind.player_guesses[0]['guess'] == guess1
+    assert mastermind.player_guesses[0]['matching_places'] == 1
+    assert mastermind.player_guesses[0]['matching_colours'] == 2
 
     ret = mastermind.add_guess(guess2)
     assert ret == False
     assert mastermind.nb_player_guesses == 2
-    assert mastermind._player_guesses[1]['guess'] == guess2
-    assert mastermind._player_guesses[1]['matching_places'] == 2
-    assert mastermind._player_guesses[1]['matching_colours'] == 2
+    assert mastermind.player_guesses[1]['guess'] == guess2
+    assert mastermind.player_guesses[1]['matching_places'] == 2
+    assert mastermind.player_guesses[1]['matching_colours'] == 2
 
 
 def test_add_winning_guess():
@@ -41,11 +46,130 @@ def test_add_winning_guess():
         code_length = 4,
         colours_set = ['Red', 'Green', 'Blue', 'Yellow']
     )
-    mastermind._secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
     ret = mastermind.add_guess(guess)
 
     assert ret == True
     assert mastermind.nb_player_guesses == 1
-    assert mastermind._player_guesses[0]['guess'] == guess
-    assert mastermind._player_guesses[0]['matching_places'] == 4
-    assert mastermind._player_guesses[0]['matching_colours'] == 0
+    assert mastermind.player_guesses[0]['guess'] == guess
+    assert mastermind.player_guesses[0]['matching_places'] == 4
+    assert mastermind.player_guesses[0]['matching_colours'] == 0
+
+
+def test_add_invalid_guesses():
+    """ Validating that invalid guesses are rejected and not added to the
+        player's guesses.
+    """
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 4,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow']
+    )
+    mastermind.reset_game()
+
+    with pytest.raises(BadGuessLengthError):
+        mastermind.add_guess(['Red', 'Green', 'Blue'])
+
+    with pytest.raises(UnknownColourError):
+        mastermind.add_guess(['Red', 'Green', 'Blue', 'Pink'])
+
+    assert mastermind.nb_player_guesses == 0
+
+
+def test_add_guesses_with_score_table(tmp_path, monkeypatch):
+    """ Validating that the score table gives the same feedback as the
+        computed one.
+    """
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 4,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow']
+    )
+    mastermind.load_score_table()
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+
+    assert mastermind.add_guess(['Red', 'Green', 'Blue', 'Yellow']) == False
+    assert mastermind.last_row_correct_positions == 1
+    assert mastermind.last_row_correct_colours == 2
+
+    assert mastermind.add_guess(['Green', 'Red', 'Blue', 'Blue']) == True
+    assert mastermind.last_row_correct_positions == 4
+    assert mastermind.last_row_correct_colours == 0
+
+
+def test_score_many():
+    """ Validating that scoring a guess against many codes at once gives the
+        same feedback as adding the guess to games with these secret codes.
+    """
+    secrets = [['Green', 'Red', 'Blue', 'Blue'],
+               ['Red', 'Green', 'Blue', 'Yellow'],
+               ['Yellow', 'Yellow', 'Yellow', 'Yellow']]
+    guess = ['Red', 'Green', 'Blue', 'Blue']
+
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 4,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow']
+    )
+    codec = mastermind.codec
+    places, colours = mastermind.score_many(codec.encode(guess),
+                                            [codec.encode(x) for x in secrets])
+
+    for i, secret in enumerate(secrets):
+        mastermind.reset_game()
+        mastermind.secret_code = secret
+        mastermind.add_guess(guess)
+        assert places[i] == mastermind.last_row_correct_positions
+        assert colours[i] == mastermind.last_row_correct_colours
+
+
+def test_score_matrix(tmp_path, monkeypatch):
+    """ Validating that the score matrix is the same with and without the
+        score table.
+    """
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 3,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow', 'White']
+    )
+    guesses = [0, 7, 31, 124]
+    codes = list(range(mastermind.codec.size))
+
+    places, colours = mastermind.score_matrix(guesses, codes)
+    assert places.shape == (4, 125)
+
+    for i, guess in enumerate(guesses):
+        for secret in codes:
+            expected = mastermind.codec.score(mastermind.codec.digits(guess),
+                                              mastermind.codec.digits(secret))
+            assert (places[i, secret], colours[i, secret]) == expected
+
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    mastermind.load_score_table()
+    table_places, table_colours = mastermind.score_matrix(guesses, codes)
+    assert (table_places == places).all()
+    assert (table_colours == colours).all()
+
+
+def test_add_guess_after_max_tries():
+    """ Validating that no guess can be added once the maximum number of tries
+        has been reached.
+    """
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 4,
+        max_tries = 2,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow']
+    )
+    mastermind.reset_game()
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+
+    assert mastermind.add_guess(['Red', 'Red', 'Red', 'Red']) == False
+    with pytest.raises(MaxTriesReachedError):
+        mastermind.add_guess(['Red', 'Red', 'Red', 'Red'])
+    with pytest.raises(MaxTriesReachedError):
+        mastermind.add_guess(['Green', 'Red', 'Blue', 'Blue'])
+
+    assert mastermind.nb_player_guesses == 2
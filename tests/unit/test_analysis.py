@@ -0,0 +1,102 @@
+from mastermind import hints
+from mastermind.analysis import GameAnalyser
+from mastermind.analysis import analyse
+from mastermind.mastermind_core import MastermindCore
+from mastermind.solver import Solver
+
+import threading
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    hints.cache.clear()
+
+
+@pytest.fixture
+def mastermind():
+    mastermind = MastermindCore(quiet=True)
+    mastermind.configure(code_length=2, colours_set=['A', 'B', 'C'])
+    mastermind.secret_code = ['A', 'B']
+    return mastermind
+
+
+def test_analyse(mastermind):
+    """ Validating that the analysis holds the hints of the game.
+    """
+    mastermind.add_guess(['A', 'A'])
+    analysis = analyse(mastermind)
+    assert analysis.nb_guesses == 1
+    assert analysis.nb_candidates == 4
+    assert analysis.suggestion == mastermind.suggest_guess()
+
+
+def test_analysis_is_scheduled(mastermind):
+    """ Validating that the analysis runs on a snapshot of the game, and is
+        delivered through the scheduler.
+    """
+    scheduled = []
+    results = []
+    with GameAnalyser(schedule=scheduled.append) as analyser:
+        future = analyser.submit(mastermind, results.append)
+        mastermind.add_guess(['A', 'A'])
+        future.result()
+
+        assert results == []
+        scheduled.pop()()
+        assert results[0].nb_guesses == 0
+        assert results[0].nb_candidates == 9
+
+
+def test_analysis_cancelled(mastermind):
+    """ Validating that the analyses replaced or cancelled before their
+        delivery are dropped.
+    """
+    scheduled = []
+    results = []
+    with GameAnalyser(schedule=scheduled.append) as analyser:
+        analyser.submit(mastermind, results.append).result()
+        mastermind.add_guess(['A', 'A'])
+        analyser.submit(mastermind, results.append).result()
+        for function in scheduled:
+            function()
+        assert [x.nb_guesses for x in results] == [1]
+
+        scheduled.clear()
+        mastermind.add_guess(['B', 'A'])
+        analyser.submit(mastermind, results.append).result()
+        analyser.cancel()
+        for function in scheduled:
+            function()
+        assert len(results) == 1
+
+
+def test_superseded_search_stops(mastermind, monkeypatch):
+    """ Validating that a new submission stops the search of the analysis in
+        progress instead of letting it run to its end.
+    """
+    searching = threading.Event()
+    stopped = []
+    check_cancelled = Solver._check_cancelled
+
+    def hold_first_search(solver):
+        # The first search waits to be superseded, the next ones go on
+        if not searching.is_set():
+            searching.set()
+            stopped.append(solver._cancel_event.wait(timeout=10))
+        check_cancelled(solver)
+
+    monkeypatch.setattr(Solver, '_check_cancelled', hold_first_search)
+    results = []
+    with GameAnalyser() as analyser:
+        mastermind.add_guess(['A', 'A'])
+        superseded = analyser.submit(mastermind, results.append)
+        assert searching.wait(timeout=10)
+        mastermind.reset_game()
+        analyser.submit(mastermind, results.append).result()
+
+        assert superseded.result() is None
+    assert stopped == [True]
+    assert [x.nb_guesses for x in results] == [0]
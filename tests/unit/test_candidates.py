@@ -0,0 +1,79 @@
+from mastermind.candidates import consistent_blocks
+from mastermind.candidates import consistent_codes
+from mastermind.candidates import consistent_mask
+from mastermind.candidates import count_consistent_codes
+from mastermind.candidates import find_consistent_code
+from mastermind.candidates import sample_consistent_codes
+from mastermind.codec import CodeCodec
+from mastermind.mastermind_core import MastermindCore
+from mastermind.solver import Solver
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('allow_duplicates', [True, False])
+def test_consistent_codes(tmp_path, monkeypatch, allow_duplicates):
+    """ Validating that the generated codes are the solver's candidates, in
+        the same order.
+    """
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    mastermind = MastermindCore(quiet=True, seed=4)
+    mastermind.configure(code_length=4, allow_duplicates=allow_duplicates,
+                         colours_set=['A', 'B', 'C', 'D', 'E', 'F'])
+    mastermind.reset_game()
+    solver = Solver(mastermind, use_score_table=False)
+
+    for guess in (['A', 'B', 'C', 'D'], ['B', 'E', 'A', 'F'], ['F', 'C', 'E', 'A']):
+        mastermind.add_guess(guess)
+        assert list(mastermind.consistent_codes()) == solver.candidates.tolist()
+
+
+@pytest.mark.parametrize('allow_duplicates', [True, False])
+def test_consistent_blocks(allow_duplicates):
+    """ Validating that the blocks of consistent codes, whatever their size,
+        hold the codes generated one at a time, and that the sampled codes are
+        consistent.
+    """
+    codec = CodeCodec(['A', 'B', 'C', 'D', 'E', 'F'], 4)
+    secret = codec.digits(codec.encode(['B', 'E', 'A', 'F']))
+    history = []
+    for guess in (['A', 'B', 'C', 'D'], ['B', 'E', 'D', 'C'], ['F', 'A', 'E', 'B']):
+        guess = codec.encode(guess)
+        history.append((guess, *codec.score(codec.digits(guess), secret)))
+
+        codes = list(consistent_codes(codec, history, allow_duplicates))
+        for block_codes in (1, 6, 100, 10000):
+            blocks = consistent_blocks(codec, history, allow_duplicates, block_codes)
+            assert np.concatenate([np.empty(0, dtype=np.int64), *blocks]).tolist() == codes
+
+        sample = sample_consistent_codes(codec, history, allow_duplicates, size=10,
+                                         generator=np.random.default_rng(1))
+        assert 0 < len(sample) <= 10
+        assert consistent_mask(codec, history, sample).all()
+        assert set(sample.tolist()) <= set(codes)
+
+
+def test_find_and_count():
+    """ Validating the early-exit queries on a code space too large to list.
+    """
+    codec = CodeCodec([f'Colour{i}' for i in range(12)], 8)
+    secret = codec.digits(codec.encode(['Colour3', 'Colour1', 'Colour4', 'Colour1',
+                                        'Colour5', 'Colour9', 'Colour2', 'Colour6']))
+    guesses = [codec.encode(['Colour0', 'Colour0', 'Colour1', 'Colour1',
+                             'Colour2', 'Colour2', 'Colour3', 'Colour3'])]
+    history = [(x, *codec.score(codec.digits(x), secret)) for x in guesses]
+
+    code = find_consistent_code(codec, history)
+    assert codec.score(codec.digits(guesses[0]), codec.digits(code)) == history[0][1:]
+    assert count_consistent_codes(codec, history, limit=1000) == 1000
+
+
+def test_no_consistent_code():
+    """ Validating that an impossible feedback has no consistent code.
+    """
+    codec = CodeCodec(['A', 'B', 'C'], 2)
+    # Both colours are in the code, so one at the right place implies the other
+    history = [(codec.encode(['A', 'B']), 1, 1)]
+    assert count_consistent_codes(codec, history) == 0
+    assert find_consistent_code(codec, history) is None
@@ -0,0 +1,80 @@
+from mastermind.cli import BatchPlayer
+from mastermind.cli import match_colours
+from mastermind.cli import play_interactive
+from mastermind.cli import run_batch
+from mastermind.mastermind_core import MastermindCore
+
+import io
+
+
+COLOURS = ['Red', 'Green', 'Blue', 'Yellow']
+
+
+def new_core(max_tries=10):
+    mastermind = MastermindCore(quiet=True)
+    mastermind.configure(code_length=4, max_tries=max_tries, colours_set=COLOURS)
+    mastermind.reset_game()
+    return mastermind
+
+
+def test_match_colours():
+    """ Validating the translation of the colours typed by the player
+    """
+    colours = ('Black', 'Blue', 'Red')
+    assert match_colours(['red', 'BLUE', 'bla', 'r'], colours) == ['Red', 'Blue', 'Black', 'Red']
+    # Ambiguous and unknown colours are kept as typed
+    assert match_colours(['bl', 'pink'], colours) == ['bl', 'pink']
+
+
+def test_batch_game():
+    """ Validating the feedback of a game replayed in batch mode
+    """
+    batch = io.StringIO("\n".join([
+        "# First game",
+        "secret Green Red Blue Blue",
+        "Red Green Blue Yellow",
+        "Green, Red, Blue, Blue",
+        "Green Red Blue Blue",
+        "",
+        "secret Red Red Red Red",
+        "Red Pink Red Red",
+        "Red Red",
+        "Red Red Red Red",
+    ]))
+    output = io.StringIO()
+    run_batch(new_core(), [batch], output)
+
+    assert output.getvalue().splitlines() == [
+        "1 2 playing",
+        "4 0 won",
+        "error GameOverError: The game is over, start a new game",
+        "error UnknownColourError: The player's guess contains colours that are not part of the current set: Pink.",
+        "error BadGuessLengthError: Incorrect player's guess size. Expected: 4, got: 2",
+        "4 0 won",
+    ]
+
+
+def test_batch_lost_game():
+    """ Validating that a game is lost after the maximum number of tries
+    """
+    player = BatchPlayer(new_core(max_tries=2))
+    assert player.process_line("secret Green Red Blue Blue") is None
+    assert player.process_line("Red Red Red Red") == "1 0 playing"
+    assert player.process_line("Yellow Yellow Yellow Yellow") == "0 0 lost"
+
+    assert player.process_line("new") is None
+    assert player.process_line("Red Red Red Red").endswith("playing")
+
+
+def test_interactive_game():
+    """ Validating a game played in the terminal
+    """
+    mastermind = new_core()
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    inputs = iter(['r g b y', 'red red', 'g r b b'])
+    output = io.StringIO()
+
+    assert play_interactive(mastermind, lambda prompt: next(inputs), output) == True
+    lines = output.getvalue().splitlines()
+    assert "Correct positions: 1, correct colours: 2" in lines
+    assert lines[-1] == "You have WON in 2 tries!"
@@ -0,0 +1,68 @@
+from mastermind.codec import CodeCodec
+
+import pytest
+
+
+def test_colours_order():
+    """ Validating that the colour indices do not depend on the order of the
+        colours set.
+    """
+    codec1 = CodeCodec(['Red', 'Green', 'Blue'], 4)
+    codec2 = CodeCodec(set(['Blue', 'Red', 'Green']), 4)
+
+    assert codec1.colours == ('Blue', 'Green', 'Red')
+    assert codec1.colours == codec2.colours
+    assert codec1.nb_colours == 3
+    assert codec1.size == 81
+
+
+def test_encode_decode():
+    """ Validating that packing and unpacking a code are symmetrical, and that
+        packed codes follow the lexicographic order of the pegs.
+    """
+    codec = CodeCodec(['Red', 'Green', 'Blue', 'Yellow'], 4)
+
+    assert codec.encode(['Blue', 'Blue', 'Blue', 'Blue']) == 0
+    assert codec.encode(['Blue', 'Blue', 'Blue', 'Green']) == 1
+    assert codec.encode(['Green', 'Blue', 'Blue', 'Blue']) == 64
+    assert codec.encode(['Yellow'] * 4) == codec.size - 1
+
+    for packed in range(codec.size):
+        assert codec.encode(codec.decode(packed)) == packed
+        assert codec.pack_digits(codec.digits(packed)) == packed
+        assert sum(x * y for x, y in zip(codec.digits(packed), codec.weights)) == packed
+
+
+def test_encode_unknown_colour():
+    """ Validating that an unknown colour cannot be packed
+    """
+    codec = CodeCodec(['Red', 'Green', 'Blue'], 3)
+    with pytest.raises(KeyError):
+        codec.encode(['Red', 'Green', 'Pink'])
+
+
+def test_has_duplicates():
+    """ Validating the detection of codes using a colour more than once
+    """
+    codec = CodeCodec(['Red', 'Green', 'Blue', 'Yellow'], 3)
+
+    assert codec.has_duplicates(codec.encode(['Red', 'Green', 'Red']))
+    assert not codec.has_duplicates(codec.encode(['Red', 'Green', 'Blue']))
+
+
+def test_score():
+    """ Validating the feedback computed on colour indices
+    """
+    codec = CodeCodec(['Red', 'Green', 'Blue', 'Yellow'], 4)
+    secret = codec.digits(codec.encode(['Green', 'Red', 'Blue', 'Blue']))
+
+    guess = codec.digits(codec.encode(['Red', 'Green', 'Blue', 'Yellow']))
+    assert codec.score(guess, secret) == (1, 2)
+
+    guess = codec.digits(codec.encode(['Red', 'Green', 'Blue', 'Blue']))
+    assert codec.score(guess, secret) == (2, 2)
+
+    guess = codec.digits(codec.encode(['Yellow', 'Yellow', 'Yellow', 'Yellow']))
+    assert codec.score(guess, secret) == (0, 0)
+
+    assert codec.score(secret, secret) == (4, 0)
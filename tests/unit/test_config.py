@@ -0,0 +1,72 @@
+import pickle
+
+from mastermind.config import BadColoursSetError
+from mastermind.config import GameConfig
+from mastermind.mastermind_core import MastermindCore
+
+import pytest
+
+
+def test_interned_configs():
+    """ Validating that the same settings give the same configuration, in any
+        colours order.
+    """
+    config = GameConfig.get(4, True, 10, ['Red', 'Green', 'Blue'])
+    assert GameConfig.get(4, True, 10, ('Blue', 'Red', 'Green', 'Red')) is config
+    assert GameConfig.get(4, False, 10, ['Red', 'Green', 'Blue', 'White']) is not config
+    assert pickle.loads(pickle.dumps(config)) is config
+
+    assert config.colours == ('Blue', 'Green', 'Red')
+    assert config.codec.colour_index('Green') == 1
+    assert config.size == 81
+    assert {config: 1}[GameConfig.get(4, True, 10, ['Green', 'Blue', 'Red'])] == 1
+
+
+def test_shared_derived_data():
+    """ Validating that the derived arrays are built once per configuration,
+        and cannot be modified.
+    """
+    config = GameConfig.get(3, False, 10, ['A', 'B', 'C', 'D'])
+    codes = config.valid_codes
+    assert len(codes) == 24
+    assert config.valid_codes is codes
+    with pytest.raises(ValueError):
+        codes[0] = 1
+
+    first = MastermindCore(quiet=True)
+    second = MastermindCore(quiet=True)
+    first.configure(3, False, 10, ['A', 'B', 'C', 'D'])
+    second.configure(3, False, 10, ['D', 'C', 'B', 'A'])
+    assert first.config is second.config is config
+    assert first.config_hash == second.config_hash
+
+
+def test_invalid_settings():
+    """ Validating that invalid settings are rejected without changing the
+        current configuration.
+    """
+    mastermind = MastermindCore(quiet=True)
+    config = mastermind.config
+
+    with pytest.raises(BadColoursSetError):
+        mastermind.configure(colours_set=[])
+    # Duplicated colours do not count
+    with pytest.raises(BadColoursSetError):
+        mastermind.configure(code_length=3, allow_duplicates=False, colours_set=['Red', 'Red', 'Blue'])
+    with pytest.raises(ValueError):
+        mastermind.configure(code_length=0)
+    with pytest.raises(ValueError):
+        mastermind.configure(max_tries=0)
+    # Upper bounds of the fields storing the settings
+    with pytest.raises(ValueError):
+        mastermind.configure(code_length=256)
+    with pytest.raises(ValueError):
+        mastermind.configure(max_tries=300)
+    with pytest.raises(BadColoursSetError):
+        mastermind.configure(colours_set=[str(x) for x in range(256)])
+    with pytest.raises(BadColoursSetError):
+        mastermind.configure(colours_set=['Red', 'x' * 256])
+
+    assert mastermind.config is config
+    assert mastermind.code_length == 4
+    assert mastermind.colours_set == config.colours_set
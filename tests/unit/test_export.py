@@ -0,0 +1,66 @@
+from mastermind.export import GameExporter
+from mastermind.export import iter_chunks
+from mastermind.export import load_games
+from mastermind.mastermind_core import MastermindCore
+from mastermind.mastermind_core import MaxTriesReachedError
+from mastermind.simulation import parse_config
+from mastermind.simulation import play_chunk
+
+import numpy as np
+import pytest
+
+
+def export_games(directory, format):
+    """ Export a won, a lost and an empty game by chunks of two games
+    """
+    core = MastermindCore(quiet=True, seed=0)
+    core.configure(max_tries=2)
+    with GameExporter(str(directory), format, chunk_size=2) as exporter:
+        core.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+        core.add_guess(['Green', 'Red', 'Blue', 'Blue'])
+        exporter.add_game(core)
+
+        core.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+        core.add_guess(['Red', 'Red', 'Red', 'Red'])
+        with pytest.raises(MaxTriesReachedError):
+            core.add_guess(['Blue', 'Blue', 'Green', 'Green'])
+        exporter.add_game(core)
+
+        core.reset_game()
+        exporter.add_game(core)
+    return core
+
+
+@pytest.mark.parametrize('format', ['npz', 'parquet'])
+def test_export_games(tmp_path, format):
+    """ Validating that the exported games are read back as columns, by
+        chunks.
+    """
+    if format == 'parquet':
+        pytest.importorskip('pyarrow')
+
+    core = export_games(tmp_path, format)
+    assert [len(x['tries']) for x in iter_chunks(str(tmp_path))] == [2, 1]
+
+    games = load_games(str(tmp_path))
+    secret = core.codec.encode(['Green', 'Red', 'Blue', 'Blue'])
+    assert games['config_hash'].tolist() == [core.config_hash] * 3
+    assert games['secret'][:2].tolist() == [secret, secret]
+    assert games['tries'].tolist() == [1, 2, 0]
+    assert games['won'].tolist() == [True, False, False]
+    assert games['guesses'].tolist() == [secret,
+                                         core.codec.encode(['Red'] * 4),
+                                         core.codec.encode(['Blue', 'Blue', 'Green', 'Green'])]
+    assert games['places'].tolist() == [4, 1, 0]
+    assert games['colours'].tolist() == [0, 0, 3]
+
+
+def test_simulation_export(tmp_path):
+    """ Validating that the simulated games are exported by the workers.
+    """
+    stats = play_chunk(parse_config('4x6', 10), 'random', '0:0', 20, str(tmp_path), 'npz')
+    games = load_games(str(tmp_path))
+
+    assert len(games['tries']) == 20
+    assert games['won'].sum() == stats.wins
+    assert len(games['guesses']) == np.sum(games['tries'])
@@ -0,0 +1,95 @@
+from mastermind import hints
+from mastermind.hints import HintCache
+from mastermind.mastermind_core import MastermindCore
+from mastermind.solver import Solver
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    hints.cache.clear()
+
+
+def test_remaining_candidates_count():
+    """ Validating that the remaining candidates are counted from the
+        player's guesses.
+    """
+    mastermind = MastermindCore(quiet=True)
+    mastermind.configure(code_length=2, colours_set=['A', 'B', 'C'])
+    mastermind.secret_code = ['A', 'B']
+    assert mastermind.remaining_candidates_count() == 9
+
+    mastermind.add_guess(['A', 'A'])
+    # Codes with a single A at any place: AB, AC, BA, CA
+    assert mastermind.remaining_candidates_count() == 4
+
+    mastermind.add_guess(['B', 'A'])
+    assert mastermind.remaining_candidates_count() == 1
+    assert mastermind.suggest_guess() == ['A', 'B']
+
+
+def test_suggest_guess():
+    """ Validating that the suggested guess is consistent with the game when
+        a single try is left.
+    """
+    mastermind = MastermindCore(quiet=True)
+    mastermind.configure(max_tries=2)
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    mastermind.add_guess(['Green', 'Green', 'Red', 'Red'])
+
+    guess = mastermind.suggest_guess('entropy')
+    assert mastermind.codec.encode(guess) in Solver(mastermind).candidates
+
+
+def test_cache_shared_by_states():
+    """ Validating that games reaching the same guesses, in any order, share
+        their cached hints.
+    """
+    first = MastermindCore(quiet=True)
+    first.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    first.add_guess(['Red', 'Red', 'Red', 'Red'])
+    first.add_guess(['Blue', 'Blue', 'Green', 'Green'])
+    suggestion = first.suggest_guess()
+    assert hints.cache.misses == 1
+    assert hints.cache.hits == 0
+
+    second = MastermindCore(quiet=True)
+    second.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    second.add_guess(['Blue', 'Blue', 'Green', 'Green'])
+    second.add_guess(['Red', 'Red', 'Red', 'Red'])
+    assert second.suggest_guess() == suggestion
+    assert second.remaining_candidates_count() == first.remaining_candidates_count()
+    assert hints.cache.hits == 3
+    assert hints.cache.misses == 1
+
+
+def test_cache_misses_on_search():
+    """ Validating that a search counts as a miss, even when the state is
+        already cached.
+    """
+    mastermind = MastermindCore(quiet=True)
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    mastermind.add_guess(['Red', 'Red', 'Red', 'Red'])
+    mastermind.remaining_candidates_count()
+    mastermind.suggest_guess()
+    assert (hints.cache.hits, hints.cache.misses) == (0, 2)
+
+    mastermind.suggest_guess('entropy')
+    mastermind.suggest_guess()
+    assert (hints.cache.hits, hints.cache.misses) == (1, 3)
+
+
+def test_cache_eviction():
+    """ Validating that the least recently used entries are evicted.
+    """
+    cache = HintCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'size': 2, 'max_size': 2}
@@ -0,0 +1,66 @@
+from mastermind.history import GuessHistory
+
+import pytest
+
+
+def test_append_and_read():
+    """ Validating that the guesses and their feedback are read back as they
+        were added.
+    """
+    history = GuessHistory(max_tries=3, code_space_size=2401)
+    assert len(history) == 0
+    assert history.capacity == 3
+
+    history.append(1234, 1, 2)
+    history.append(2400, 0, 3)
+
+    assert len(history) == 2
+    assert history[0] == (1234, 1, 2)
+    assert history[-1] == (2400, 0, 3)
+    assert history[1:] == [(2400, 0, 3)]
+    assert list(history) == [(1234, 1, 2), (2400, 0, 3)]
+    assert history.last_places == 0
+    assert history.last_colours == 3
+
+    with pytest.raises(IndexError):
+        history[2]
+
+
+def test_capacity():
+    """ Validating that the history cannot grow beyond its capacity, and can be
+        reused once cleared.
+    """
+    history = GuessHistory(max_tries=2, code_space_size=16)
+    history.append(1, 0, 0)
+    history.append(2, 0, 0)
+    assert history.is_full
+
+    with pytest.raises(IndexError):
+        history.append(3, 0, 0)
+
+    history.clear()
+    assert len(history) == 0
+    history.append(3, 1, 1)
+    assert history[0] == (3, 1, 1)
+
+
+def test_huge_codes():
+    """ Validating that codes that do not fit into 64 bits are stored
+    """
+    history = GuessHistory(max_tries=2, code_space_size=20 ** 16)
+    history.append(20 ** 16 - 1, 16, 0)
+    assert history[0] == (20 ** 16 - 1, 16, 0)
+
+
+def test_last_feedback():
+    """ Validating that the last feedback is not read from a cleared history
+    """
+    history = GuessHistory(max_tries=2, code_space_size=16)
+    history.append(1, 2, 0)
+    assert (history.last_places, history.last_colours) == (2, 0)
+
+    history.clear()
+    with pytest.raises(IndexError):
+        history.last_places
+    with pytest.raises(IndexError):
+        history.last_colours
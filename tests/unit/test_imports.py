@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import warnings
+
+import pytest
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modules that must be usable without a graphical environment
+HEADLESS_MODULES = ['mastermind.mastermind_core',
+                    'mastermind.cli',
+                    'mastermind.solver',
+                    'mastermind.simulation',
+                    'mastermind.server',
+                    'mastermind.loadgen',
+                    'mastermind.journal',
+                    'mastermind.export',
+                    'mastermind.hints',
+                    'mastermind.symmetry',
+                    'mastermind.candidates',
+                    'mastermind.config',
+                    'mastermind.metrics',
+                    'mastermind.opening_book',
+                    'mastermind.parallel_search',
+                    'mastermind.analysis']
+
+# Budget for a cold import, about twice the slowest module (the server, at
+# 100 to 200 ms, mostly spent in importing NumPy and asyncio). Exceeding it
+# only warns, as the timings depend on the load of the machine and on its disk
+# cache.
+IMPORT_TIME_BUDGET_US = 400000
+
+
+def import_module(module):
+    """ Import a module in a new interpreter. Return the modules it loaded and
+        the cumulative import time of the module, in microseconds.
+    """
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT_DIR,
+                             capture_output=True, text=True, check=True)
+
+    import_time = None
+    for line in process.stderr.splitlines():
+        fields = [x.strip() for x in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            import_time = int(fields[1])
+
+    return process.stdout.split(), import_time
+
+
+@pytest.mark.parametrize('module', HEADLESS_MODULES)
+def test_headless_import(module):
+    """ Validating that the headless modules do not import Kivy, and
+        reporting the ones slow to import.
+    """
+    modules, import_time = import_module(module)
+
+    assert [x for x in modules if x.split('.')[0] == 'kivy'] == []
+    assert import_time is not None
+    if import_time > IMPORT_TIME_BUDGET_US:
+        warnings.warn(f"Importing {module} took {import_time / 1000:.0f} ms, over the "
+                      f"{IMPORT_TIME_BUDGET_US / 1000:.0f} ms budget")
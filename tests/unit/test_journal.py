@@ -0,0 +1,154 @@
+from mastermind.journal import JournalFormatError
+from mastermind.journal import JournalReader
+from mastermind.journal import JournalWriter
+from mastermind.journal import NEW_GAME
+from mastermind.mastermind_core import MastermindCore
+from mastermind.mastermind_core import MaxTriesReachedError
+
+import pytest
+
+
+def play(core, guesses):
+    for guess in guesses:
+        try:
+            core.add_guess(guess)
+        except MaxTriesReachedError:
+            pass
+
+
+def test_replay_games(tmp_path):
+    """ Validating that the journaled games are read back with their
+        configuration, secret code and guesses.
+    """
+    path = str(tmp_path / 'games.journal')
+    core = MastermindCore(quiet=True, seed=1)
+
+    with JournalWriter(path) as journal:
+        journal.attach(core)
+        core.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+        play(core, [['Red', 'Red', 'Red', 'Red'], ['Green', 'Red', 'Blue', 'Blue']])
+
+        core.configure(code_length=3, allow_duplicates=False, max_tries=2, colours_set=['A', 'B', 'C'])
+        core.secret_code = ['A', 'B', 'C']
+        play(core, [['C', 'B', 'A'], ['B', 'C', 'A']])
+
+    with JournalReader(path) as reader:
+        # The first game is the one started by attach(), the third the one
+        # started by configure()
+        assert reader.nb_games == 4
+
+        game = reader.read_game(1)
+        assert game.secret == ['Green', 'Red', 'Blue', 'Blue']
+        assert game.config.code_length == 4
+        assert game.config.allow_duplicates
+        assert [(x.guess, x.places, x.colours) for x in game.guesses] == [
+            (['Red', 'Red', 'Red', 'Red'], 1, 0),
+            (['Green', 'Red', 'Blue', 'Blue'], 4, 0)]
+
+        assert reader.read_game(2).guesses == []
+        game = reader.read_game(3)
+        assert game.config == (3, 2, False, ('A', 'B', 'C'))
+        assert game.secret == ['A', 'B', 'C']
+        assert [(x.places, x.colours) for x in game.guesses] == [(1, 2), (0, 3)]
+
+        with pytest.raises(KeyError):
+            reader.read_game(4)
+
+
+def test_restore_game(tmp_path):
+    """ Validating that a game state is rebuilt from the journal.
+    """
+    path = str(tmp_path / 'games.journal')
+    core = MastermindCore(quiet=True, seed=2)
+
+    with JournalWriter(path) as journal:
+        journal.attach(core)
+        core.secret_code = ['Black', 'White', 'Yellow', 'Blue']
+        play(core, [['Black', 'Black', 'Blue', 'Blue'], ['White', 'Black', 'Yellow', 'Blue']])
+
+    with JournalReader(path) as reader:
+        restored = reader.restore_game(1)
+
+    assert restored.secret_code == core.secret_code
+    assert restored.player_guesses == core.player_guesses
+
+
+def test_interleaved_games(tmp_path):
+    """ Validating that the games of several cores sharing a journal are kept
+        apart, and that reopening a journal appends to it.
+    """
+    path = str(tmp_path / 'games.journal')
+    cores = [MastermindCore(quiet=True, seed=x) for x in range(2)]
+
+    with JournalWriter(path, flush_size=64) as journal:
+        for core in cores:
+            journal.attach(core)
+        for _ in range(3):
+            for core in cores:
+                core.add_guess(['Green', 'Green', 'Red', 'Red'])
+
+    with JournalWriter(path) as journal:
+        journal.attach(cores[0])
+        cores[0].add_guess(['Blue'] * 4)
+
+    with JournalReader(path) as reader:
+        assert reader.nb_games == 3
+        assert len(reader.read_game(0).guesses) == 3
+        assert len(reader.read_game(1).guesses) == 3
+        assert [x.guess for x in reader.read_game(2).guesses] == [['Blue'] * 4]
+        assert sum(1 for x in reader.records() if x[1] == NEW_GAME) == 3
+
+
+def test_not_a_journal(tmp_path):
+    """ Validating that other files are rejected.
+    """
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a journal')
+    with pytest.raises(JournalFormatError):
+        JournalReader(str(path))
+
+
+def test_unfinished_game(tmp_path, monkeypatch):
+    """ Validating that a game left unfinished is read from its own records,
+        without scanning the games journaled after it.
+    """
+    path = str(tmp_path / 'games.journal')
+    left = MastermindCore(quiet=True, seed=3)
+    other = MastermindCore(quiet=True, seed=4)
+
+    with JournalWriter(path, flush_size=64) as journal:
+        journal.attach(left)
+        left.add_guess(['Green', 'Green', 'Red', 'Red'])
+        journal.attach(other)
+        for _ in range(20):
+            play(other, [['Blue'] * 4, ['White'] * 4])
+            other.reset_game()
+        left.add_guess(['Blue', 'Blue', 'Red', 'Red'])
+
+    with JournalReader(path) as reader:
+        read_records = []
+        records = reader.records
+        monkeypatch.setattr(reader, 'records', lambda offset=None: read_records.append(offset) or records(offset))
+
+        game = reader.read_game(0)
+        assert [x.guess for x in game.guesses] == [['Green', 'Green', 'Red', 'Red'], ['Blue', 'Blue', 'Red', 'Red']]
+        # The configuration, the start of the game and its guesses
+        assert len(read_records) == 4
+
+
+def test_guesses_after_win(tmp_path):
+    """ Validating that the guesses added after a win are journaled like the
+        previous ones.
+    """
+    path = str(tmp_path / 'games.journal')
+    core = MastermindCore(quiet=True, seed=5)
+
+    with JournalWriter(path) as journal:
+        journal.attach(core)
+        core.add_guess(core.secret_code)
+        core.add_guess(core.secret_code)
+        assert core.nb_player_guesses == 2
+
+    with JournalReader(path) as reader:
+        game = reader.read_game(0)
+        assert [x.guess for x in game.guesses] == [core.secret_code] * 2
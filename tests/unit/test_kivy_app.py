@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+# Keep Kivy from parsing the arguments of pytest
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+pytest.importorskip('kivy')
+
+from kivy.lang import Builder
+
+from mastermind.kivy_app import MastermindBoard
+from mastermind.mastermind_core import MastermindCore
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+KV_FILE = os.path.join(ROOT_DIR, 'mastermind', 'mastermind.kv')
+
+
+@pytest.fixture
+def board(tmp_path, monkeypatch):
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    # The atlas of the pegs is found from the root directory
+    monkeypatch.chdir(ROOT_DIR)
+    Builder.load_file(KV_FILE)
+
+    mastermind = MastermindCore(quiet=True)
+    mastermind.secret_code = ['Red', 'Green', 'Blue', 'Black']
+    board = MastermindBoard()
+    board.add_logic_manager(mastermind)
+    board.draw_main_board()
+    yield board
+
+    board.analyser.close()
+    Builder.unload_file(KV_FILE)
+
+
+def test_reset_main_board(board):
+    """ Validating that resetting the board removes the validators of the
+        played rows, and keeps the spacers of the checkers.
+    """
+    board.update_row_widgets(0, 1, 3)
+    assert len(board.widgets['pos_check_0'].children) == 2
+    assert len(board.widgets['col_check_0'].children) == 4
+
+    board.reset_main_board()
+    for name in ('pos', 'col'):
+        assert board.widgets[f'{name}_check_0'].children == [board.widgets[f'{name}_spacer_0']]
+    assert not board.widgets['peg_spot_0_0'].disabled
+    assert board.widgets['peg_spot_1_0'].disabled
+
+
+def test_validate_row(board):
+    """ Validating that a validated row is closed right away, while its
+        response is displayed at the next frame.
+    """
+    # As when the last peg of the row is placed
+    board.current_row = ['Red', 'Blue', 'Green', 'White']
+    board.toggle_validate_button(0, set_enable=True)
+    board.validate_row(None)
+
+    assert board.current_row == [None] * 4
+    assert board.widgets['butt_validate_0'].disabled
+    assert board.widgets['peg_spot_0_0'].disabled
+    assert not board.widgets['peg_spot_1_0'].disabled
+    assert len(board.widgets['col_check_0'].children) == 1
+
+    board.apply_updates()
+    assert len(board.widgets['pos_check_0'].children) == 2
+    assert len(board.widgets['col_check_0'].children) == 3
@@ -1,6 +1,7 @@
 from mastermind.mastermind_core import MastermindCore
 from mastermind.mastermind_core import BadColoursSetError
 
+import logging
 import pytest
 
 
@@ -97,6 +98,27 @@ def test_generate_code_peg_with_no_duplicates():
             assert next(generator) in mastermind.colours_set
 
 
+def test_configure_starts_game():
+    """ Validating that configuring starts a new game, so that the guesses
+        are scored against a secret code of the new configuration.
+    """
+    mastermind = MastermindCore(quiet=True, seed=1)
+    mastermind.add_guess(mastermind.secret_code)
+    mastermind.configure(code_length=5, colours_set=list('ABCDEFGH'))
+
+    assert mastermind.nb_player_guesses == 0
+    assert len(mastermind.secret_code) == 5
+    guess = ['A', 'A', 'B', 'C', 'D']
+    expected = mastermind.codec.score(mastermind.codec.digits(mastermind.codec.encode(guess)),
+                                      mastermind.codec.digits(mastermind.packed_secret))
+    mastermind.add_guess(guess)
+    assert (mastermind.last_row_correct_positions, mastermind.last_row_correct_colours) == expected
+
+    mastermind.configure(code_length=3, colours_set=['Red', 'Green', 'Blue'])
+    mastermind.add_guess(mastermind.secret_code)
+    assert mastermind.last_row_correct_positions == 3
+
+
 def test_bad_colours_set():
     """ Validating that the BadColoursSetError exception is raised when required
     """
@@ -106,3 +128,92 @@ def test_bad_colours_set():
             code_length = 4,
             allow_duplicates = False,
             colours_set = ['Red', 'Green', 'Blue'])
+
+
+def test_logging(caplog):
+    """ Validating that the core does not change the root logger level, and
+        that the quiet mode does not log the guesses.
+    """
+    root_level = logging.getLogger().level
+    mastermind = MastermindCore()
+    assert logging.getLogger().level == root_level
+
+    with caplog.at_level(logging.INFO, logger='mastermind.mastermind_core'):
+        mastermind.add_guess(mastermind.secret_code)
+        assert len(caplog.records) > 0
+
+        caplog.clear()
+        mastermind.quiet = True
+        mastermind.reset_game()
+        mastermind.add_guess(mastermind.secret_code)
+        assert len(caplog.records) == 0
+
+
+def test_seeded_games():
+    """ Validating that seeded games are reproducible
+    """
+    mastermind1 = MastermindCore(seed=42)
+    mastermind2 = MastermindCore(seed=42)
+    for i in range(20):
+        mastermind1.reset_game()
+        mastermind2.reset_game()
+        assert mastermind1.secret_code == mastermind2.secret_code
+
+    mastermind1.seed(7)
+    mastermind2.seed(7)
+    assert list(mastermind1.generate_secret_codes(100)) == list(mastermind2.generate_secret_codes(100))
+
+
+def test_reset_game_with_secret():
+    """ Validating that a game can be started from a given packed secret code
+    """
+    mastermind = MastermindCore()
+    mastermind.reset_game(0)
+    assert mastermind.secret_code == ['Black'] * 4
+
+    with pytest.raises(ValueError):
+        mastermind.reset_game(mastermind.codec.size)
+
+
+def test_generate_secret_codes():
+    """ Validating the bulk generation of secret codes, with and without
+        duplicates.
+    """
+    mastermind = MastermindCore(seed=1)
+    codes = mastermind.generate_secret_codes(1000)
+    assert len(codes) == 1000
+    assert ((codes >= 0) & (codes < mastermind.codec.size)).all()
+    assert len(set(codes)) > 500
+
+    mastermind.configure(
+        code_length = 4,
+        allow_duplicates = False,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow', 'White']
+    )
+    codes = mastermind.generate_secret_codes(1000)
+    assert ((codes >= 0) & (codes < mastermind.codec.size)).all()
+    assert not any(mastermind.codec.has_duplicates(int(x)) for x in codes)
+    assert len(set(codes)) == 120
+
+
+@pytest.mark.parametrize('allow_duplicates', [True, False])
+def test_generate_large_secret_codes(allow_duplicates):
+    """ Validating the bulk generation of secret codes too large for NumPy
+        integers.
+    """
+    mastermind = MastermindCore(quiet=True, seed=1)
+    mastermind.configure(
+        code_length = 16,
+        allow_duplicates = allow_duplicates,
+        colours_set = [f'Colour{i}' for i in range(40)]
+    )
+    codes = mastermind.generate_secret_codes(100)
+    assert len(codes) == 100
+    assert all(0 <= x < mastermind.codec.size for x in codes)
+    assert len(set(codes)) == 100
+    assert any(x >= 1 << 63 for x in codes)
+    if not allow_duplicates:
+        assert not any(mastermind.codec.has_duplicates(int(x)) for x in codes)
+
+    mastermind.reset_game(int(codes[0]))
+    assert mastermind.add_guess(mastermind.secret_code)
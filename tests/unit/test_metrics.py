@@ -0,0 +1,97 @@
+import io
+import urllib.request
+
+from mastermind.mastermind_core import BadGuessLengthError
+from mastermind.mastermind_core import MastermindCore
+from mastermind.mastermind_core import MaxTriesReachedError
+from mastermind.mastermind_core import UnknownColourError
+from mastermind.metrics import Metrics
+from mastermind.metrics import profile
+
+import pytest
+
+
+def play_instrumented_games(metrics):
+    mastermind = metrics.instrument(MastermindCore(quiet=True))
+    mastermind.configure(max_tries=2)
+
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    mastermind.add_guess(['Green', 'Red', 'Blue', 'Blue'])
+
+    mastermind.reset_game()
+    with pytest.raises(BadGuessLengthError):
+        mastermind.add_guess(['Green'])
+    with pytest.raises(UnknownColourError):
+        mastermind.add_guess(['Green', 'Red', 'Blue', 'Pink'])
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    mastermind.add_guess(['Red'] * 4)
+    with pytest.raises(MaxTriesReachedError):
+        mastermind.add_guess(['Blue'] * 4)
+    return mastermind
+
+
+def test_counters_and_histograms():
+    """ Validating that the operations, errors and outcomes of the games are
+        counted and timed.
+    """
+    metrics = Metrics()
+    mastermind = play_instrumented_games(metrics)
+    counters = metrics.snapshot()['counters']
+
+    assert counters['games_total'] == {'outcome=started': 4, 'outcome=won': 1, 'outcome=lost': 1}
+    assert counters['calls_total']['operation=add_guess'] == 2
+    assert counters['errors_total']['operation=add_guess,type=BadGuessLengthError'] == 1
+    assert counters['errors_total']['operation=check_guess,type=UnknownColourError'] == 1
+    assert counters['errors_total']['operation=add_guess,type=MaxTriesReachedError'] == 1
+
+    histograms = metrics.snapshot()['histograms']
+    assert histograms['add_guess_seconds']['count'] == 5
+    assert histograms['check_guess_seconds']['count'] == 5
+    assert sum(histograms['configure_seconds']['counts']) == 1
+
+    # Removing the instrumentation stops the collection
+    metrics.uninstrument(mastermind)
+    mastermind.reset_game()
+    assert metrics.snapshot()['counters']['games_total']['outcome=started'] == 4
+
+
+def test_prometheus_export(tmp_path):
+    """ Validating the Prometheus text format, written to a file and served
+        over HTTP.
+    """
+    metrics = Metrics()
+    play_instrumented_games(metrics)
+
+    text = metrics.prometheus_text()
+    assert '# TYPE mastermind_games_total counter' in text
+    assert 'mastermind_games_total{outcome="won"} 1' in text
+    assert '# TYPE mastermind_add_guess_seconds histogram' in text
+    assert 'mastermind_add_guess_seconds_bucket{le="+Inf"} 5' in text
+    assert 'mastermind_add_guess_seconds_count 5' in text
+
+    path = tmp_path / 'mastermind.prom'
+    metrics.write_prometheus(str(path))
+    assert path.read_text() == text
+
+    server = metrics.serve_prometheus(port=0)
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+        with urllib.request.urlopen(url) as response:
+            assert response.read().decode('utf-8') == text
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_profile(tmp_path):
+    """ Validating that the profiled block stats are printed or dumped.
+    """
+    output = io.StringIO()
+    with profile(output=output):
+        MastermindCore(quiet=True).add_guess(['Red'] * 4)
+    assert 'add_guess' in output.getvalue()
+
+    path = tmp_path / 'profile.stats'
+    with profile(str(path)):
+        MastermindCore(quiet=True)
+    assert path.stat().st_size > 0
@@ -0,0 +1,94 @@
+from mastermind import hints
+from mastermind.config import GameConfig
+from mastermind.mastermind_core import MastermindCore
+from mastermind.opening_book import OpeningBook
+from mastermind.opening_book import OpeningBookError
+from mastermind.opening_book import book_path
+from mastermind.opening_book import build_opening_book
+from mastermind.opening_book import load_opening_book
+from mastermind.opening_book import save_opening_book
+from mastermind.solver import Solver
+
+import numpy as np
+import pytest
+
+
+COLOURS = ['Red', 'Green', 'Blue', 'Yellow', 'White']
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize('allow_duplicates', [True, False])
+def test_book_follows_solver(allow_duplicates):
+    """ Validating that the book plays the solver's guesses for every secret,
+        within the maximum number of tries.
+    """
+    config = GameConfig.get(3, allow_duplicates, 6, COLOURS)
+    book = load_opening_book(config, 'minimax')
+    tries = book.verify(config.codec, config.valid_codes)
+    assert len(tries) == len(config.valid_codes)
+    assert tries.max() <= 6
+
+    mastermind = MastermindCore(quiet=True)
+    mastermind.configure(3, allow_duplicates, 6, COLOURS)
+    solver = Solver(mastermind)
+    for secret in config.valid_codes:
+        mastermind.reset_game(int(secret))
+        solver.reset()
+        while True:
+            guess = solver.next_guess()
+            assert book.lookup(mastermind.history) == guess
+            if mastermind.add_guess(mastermind.codec.decode(guess)):
+                break
+
+    # The loaded book also answers the hints
+    mastermind.reset_game()
+    hints.cache.clear()
+    assert mastermind.codec.encode(mastermind.suggest_guess()) == book.guess(0)
+    assert hints.cache.misses == 0
+
+
+def test_lookup_off_book():
+    """ Validating that games leaving the book are detected.
+    """
+    config = GameConfig.get(3, True, 6, COLOURS)
+    book = load_opening_book(config)
+    other_guess = (book.guess(0) + 1) % config.size
+    assert book.lookup([(other_guess, 0, 0)]) is None
+
+
+def test_verify_fails_when_too_few_tries(cache_dir):
+    """ Validating that the verification rejects a book unable to solve every
+        secret within the maximum number of tries.
+    """
+    config = GameConfig.get(3, True, 2, COLOURS)
+    guesses, children = build_opening_book(config)
+    path = str(cache_dir / 'book.bin')
+    save_opening_book(path, config, 'minimax', guesses, children)
+
+    book = OpeningBook(path)
+    with pytest.raises(OpeningBookError):
+        book.verify(config.codec, config.valid_codes)
+    with pytest.raises(OpeningBookError):
+        load_opening_book(config)
+    assert not (cache_dir / book_path(config, 'minimax')).exists()
+
+
+def test_invalid_files(cache_dir):
+    """ Validating that truncated or foreign files are rejected, and rebuilt
+        in the cache.
+    """
+    config = GameConfig.get(3, True, 6, COLOURS)
+    path = book_path(config, 'entropy')
+    with open(path, 'wb') as book_file:
+        book_file.write(b'MMBOOK01' + bytes(100))
+    with pytest.raises(OpeningBookError):
+        OpeningBook(path)
+
+    book = load_opening_book(config, 'entropy')
+    assert book.strategy == 'entropy'
+    assert np.all(book.verify(config.codec, config.valid_codes) > 0)
@@ -0,0 +1,49 @@
+from mastermind.mastermind_core import MastermindCore
+from mastermind.parallel_search import ParallelSearch
+from mastermind import solver
+from mastermind.solver import Solver
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def parallel():
+    with ParallelSearch(workers=2, min_cells=0) as search:
+        yield search
+
+
+@pytest.mark.parametrize('strategy', ['minimax', 'entropy'])
+@pytest.mark.parametrize('use_score_table', [True, False])
+def test_same_guesses_as_serial(tmp_path, monkeypatch, parallel, strategy, use_score_table):
+    """ Validating that the parallel search plays the same games as the
+        serial one, with and without a score table.
+    """
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    games = [play_games(search, strategy, use_score_table) for search in (None, parallel)]
+    assert games[0] == games[1]
+
+
+def test_sampled_candidates(tmp_path, monkeypatch, parallel):
+    """ Validating that the parallel search breaks the ties like the serial
+        one when the solver only knows a sample of the candidates.
+    """
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(solver, '_first_guesses', {})
+    monkeypatch.setattr(solver, 'MAX_LISTED_CODES', 0)
+    monkeypatch.setattr(solver, 'MAX_LISTED_CANDIDATES', 16)
+    monkeypatch.setattr(solver, 'SAMPLE_SIZE', 16)
+    games = [play_games(search, 'minimax', False) for search in (None, parallel)]
+    assert games[0] == games[1]
+
+
+def play_games(search, strategy, use_score_table):
+    mastermind = MastermindCore(quiet=True, seed=5)
+    mastermind.configure(code_length=4, colours_set=['A', 'B', 'C', 'D', 'E', 'F'])
+    player = Solver(mastermind, strategy, use_score_table=use_score_table, parallel=search)
+    games = []
+    for secret in mastermind.generate_secret_codes(5):
+        mastermind.reset_game(int(secret))
+        player.reset()
+        player.play()
+        games.append([guess for guess, _, _ in mastermind.history])
+    return games
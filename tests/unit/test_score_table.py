@@ -0,0 +1,64 @@
+from mastermind.codec import CodeCodec
+from mastermind import score_table
+from mastermind.score_table import ScoreTableTooLargeError
+from mastermind.score_table import build_score_table
+from mastermind.score_table import code_digits
+from mastermind.score_table import load_score_table
+from mastermind.score_table import split_feedback_code
+
+import numpy as np
+import pytest
+
+
+def test_build_score_table():
+    """ Validating that the table holds the feedback of every (guess, secret)
+        pair.
+    """
+    codec = CodeCodec(['Red', 'Green', 'Blue'], 3)
+    table = build_score_table(codec)
+
+    assert table.shape == (27, 27)
+    assert table.dtype == np.uint8
+    for guess in range(codec.size):
+        for secret in range(codec.size):
+            expected = codec.score(codec.digits(guess), codec.digits(secret))
+            assert split_feedback_code(table[guess, secret], codec.code_length) == expected
+
+
+def test_build_score_table_too_large():
+    """ Validating that huge configurations are refused
+    """
+    codec = CodeCodec([f'Colour{i}' for i in range(12)], 8)
+    with pytest.raises(ScoreTableTooLargeError):
+        build_score_table(codec)
+
+
+def test_load_score_table_cache(tmp_path, monkeypatch):
+    """ Validating that the table is cached on disk and memory-mapped by the
+        next processes.
+    """
+    monkeypatch.setattr(score_table, '_tables', {})
+    codec = CodeCodec(['Red', 'Green', 'Blue', 'Yellow'], 3)
+
+    table = load_score_table(codec, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob('score_table_*.npy'))) == 1
+    assert load_score_table(codec, cache_dir=tmp_path) is table
+
+    # A new process maps the cached file instead of building the table again
+    monkeypatch.setattr(score_table, '_tables', {})
+    monkeypatch.setattr(score_table, 'build_score_table', None)
+    mapped = load_score_table(codec, cache_dir=tmp_path)
+    assert isinstance(mapped, np.memmap)
+    assert np.array_equal(mapped, table)
+
+
+def test_code_digits():
+    """ Validating the vectorised unpacking of codes
+    """
+    codec = CodeCodec(['Red', 'Green', 'Blue', 'Yellow', 'White'], 4)
+    codes = [0, 1, 42, 311, codec.size - 1]
+
+    digits = code_digits(codec, codes)
+    assert digits.shape == (5, 4)
+    for i, code in enumerate(codes):
+        assert list(digits[i]) == codec.digits(code)
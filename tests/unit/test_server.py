@@ -0,0 +1,168 @@
+from mastermind.loadgen import GameClient
+from mastermind.metrics import Metrics
+from mastermind.server import GameServer
+from mastermind.server import SessionTable
+from mastermind.server import TooManySessionsError
+from mastermind.server import UnknownSessionError
+
+import asyncio
+import json
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_session_ttl():
+    """ Validating that idle sessions are evicted, and that used sessions are
+        kept alive.
+    """
+    clock = FakeClock()
+    sessions = SessionTable(max_sessions=10, ttl=60, clock=clock)
+    session1 = sessions.create()
+    session2 = sessions.create()
+
+    clock.now = 50
+    assert sessions.get(session1.session_id) is session1
+
+    clock.now = 100
+    assert sessions.evict_expired() == 1
+    assert len(sessions) == 1
+    with pytest.raises(UnknownSessionError):
+        sessions.get(session2.session_id)
+
+
+def test_session_cap():
+    """ Validating that the number of sessions is capped, idle sessions being
+        evicted to make room for new ones.
+    """
+    clock = FakeClock()
+    sessions = SessionTable(max_sessions=2, ttl=60, clock=clock)
+    sessions.create()
+    sessions.create()
+    with pytest.raises(TooManySessionsError):
+        sessions.create()
+
+    clock.now = 100
+    sessions.create()
+    assert len(sessions) == 1
+
+
+def test_play_game():
+    """ Validating a whole game played through the protocol
+    """
+    server = GameServer()
+    game = server.handle_request({'op': 'new_game', 'id': 1, 'code_length': 3,
+                                  'colours_set': ['Red', 'Green', 'Blue']})
+    assert game['ok'] == True
+    assert game['id'] == 1
+    assert game['colours_set'] == ['Blue', 'Green', 'Red']
+
+    session = server.sessions.get(game['session'])
+    session.core.secret_code = ['Red', 'Green', 'Blue']
+
+    response = server.handle_request({'op': 'guess', 'session': game['session'],
+                                      'guess': ['Red', 'Blue', 'Green']})
+    assert response['ok'] == True
+    assert (response['places'], response['colours']) == (1, 2)
+    assert response['game_over'] == False
+
+    response = server.handle_request({'op': 'guess', 'session': game['session'],
+                                      'guess': ['Red', 'Green', 'Blue']})
+    assert response['won'] == True
+    assert response['game_over'] == True
+    assert response['tries'] == 2
+
+    status = server.handle_request({'op': 'status', 'session': game['session']})
+    assert len(status['guesses']) == 2
+    assert status['secret_code'] == ['Red', 'Green', 'Blue']
+
+    response = server.handle_request({'op': 'guess', 'session': game['session'],
+                                      'guess': ['Red', 'Green', 'Blue']})
+    assert response['ok'] == False
+
+
+def test_errors():
+    """ Validating that invalid requests are reported to the client
+    """
+    server = GameServer()
+    game = server.handle_request({'op': 'new_game'})
+
+    response = server.handle_request({'op': 'guess', 'session': game['session'],
+                                      'guess': ['Red', 'Green', 'Pink', 'Blue']})
+    assert response['type'] == 'UnknownColourError'
+
+    response = server.handle_request({'op': 'status', 'session': 'unknown'})
+    assert response['type'] == 'UnknownSessionError'
+
+    response = server.handle_request({'op': 'new_game', 'code_length': 5,
+                                      'allow_duplicates': False, 'colours_set': ['Red']})
+    assert response['type'] == 'BadColoursSetError'
+    assert len(server.sessions) == 1
+
+    response = json.loads(server.handle_line(b'{not json'))
+    assert response['type'] == 'ProtocolError'
+
+
+def test_game_limits(monkeypatch):
+    """ Validating that the games larger than the server's limits are
+        rejected, and that internal errors are reported too.
+    """
+    server = GameServer()
+    for parameters in ({'max_tries': 100000000}, {'max_tries': 10 ** 11}, {'code_length': 10 ** 6},
+                       {'colours_set': [str(x) for x in range(1000)]}):
+        response = server.handle_request(dict(op='new_game', **parameters))
+        assert response['ok'] == False
+        assert response['type'] == 'ProtocolError'
+    assert len(server.sessions) == 0
+
+    def fail(request):
+        raise MemoryError()
+
+    game = server.handle_request({'op': 'new_game', 'id': 1})
+    monkeypatch.setitem(server._operations, 'status', fail)
+    response = server.handle_request({'op': 'status', 'id': 2, 'session': game['session']})
+    assert response == {'id': 2, 'ok': False, 'error': "Internal server error", 'type': 'InternalError'}
+
+
+def test_tcp_server():
+    """ Validating the protocol over a TCP connection
+    """
+    async def scenario():
+        server = GameServer()
+        tcp_server = await asyncio.start_server(server.handle_client, '127.0.0.1', 0)
+        port = tcp_server.sockets[0].getsockname()[1]
+
+        client = await GameClient.connect('127.0.0.1', port)
+        game = await client.request('new_game')
+        response = await client.request('guess', session=game['session'],
+                                        guess=game['colours_set'][:4])
+        await client.close()
+
+        tcp_server.close()
+        await tcp_server.wait_closed()
+        return game, response
+
+    game, response = asyncio.run(scenario())
+    assert game['ok'] == True
+    assert response['ok'] == True
+    assert response['tries'] == 1
+
+
+def test_session_metrics():
+    """ Validating that the games of the sessions are measured when the server
+        has metrics.
+    """
+    metrics = Metrics()
+    server = GameServer(metrics=metrics)
+    session = server.handle_request({'op': 'new_game'})['session']
+    server.handle_request({'op': 'guess', 'session': session, 'guess': ['Red'] * 4})
+
+    counters = metrics.snapshot()['counters']
+    assert counters['games_total']['outcome=started'] == 1
+    assert counters['calls_total']['operation=add_guess'] == 1
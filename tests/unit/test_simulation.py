@@ -0,0 +1,78 @@
+from mastermind.config import GameConfig
+from mastermind.simulation import SimulationStats
+from mastermind.simulation import parse_config
+from mastermind.simulation import play_chunk
+from mastermind.simulation import simulate
+
+import pytest
+
+
+def test_parse_config():
+    """ Validating the parsing of the configurations given on the command line
+    """
+    config = parse_config('4x6', 10)
+    assert config['code_length'] == 4
+    assert config['allow_duplicates'] == True
+    assert config['max_tries'] == 10
+    assert len(config['colours_set']) == 6
+
+    config = parse_config('5x12:nodup', 12)
+    assert config['code_length'] == 5
+    assert config['allow_duplicates'] == False
+    assert len(set(config['colours_set'])) == 12
+
+
+def test_stats_merge():
+    """ Validating the aggregation of the statistics
+    """
+    stats1 = SimulationStats(max_tries=4)
+    stats1.add_game(True, 2)
+    stats1.add_game(False, 4)
+    stats2 = SimulationStats(max_tries=4)
+    stats2.add_game(True, 4)
+
+    stats1.merge(stats2)
+    assert stats1.games == 3
+    assert stats1.wins == 2
+    assert stats1.tries_histogram == [0, 0, 1, 0, 1]
+    assert stats1.mean_tries == 3.0
+    assert stats1.as_dict()['tries_histogram'] == {2: 1, 4: 1}
+
+
+def test_play_chunk_deterministic(tmp_path, monkeypatch):
+    """ Validating that a chunk of games only depends on its seed
+    """
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    config = parse_config('3x4', 10)
+
+    stats1 = play_chunk(config, 'minimax', '1:0', 50)
+    stats2 = play_chunk(config, 'minimax', '1:0', 50)
+    assert stats1.games == 50
+    assert stats1.wins == 50
+    assert stats1.tries_histogram == stats2.tries_histogram
+
+
+def test_random_player_large_configuration(tmp_path, monkeypatch):
+    """ Validating that the random player never lists the codes of the
+        configuration, and that its games only depend on the seed.
+    """
+    monkeypatch.setenv('MASTERMIND_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(GameConfig, 'valid_codes', property(lambda self: pytest.fail("Codes listed")))
+    config = parse_config('8x12', 12)
+
+    stats1 = play_chunk(config, 'random', '1:0', 20)
+    stats2 = play_chunk(config, 'random', '1:0', 20)
+    assert stats1.games == 20
+    assert stats1.as_dict() == stats2.as_dict()
+
+
+def test_simulate():
+    """ Validating that all the games are played and aggregated across the
+        worker processes.
+    """
+    config = parse_config('2x3', 10)
+    stats, elapsed = simulate(config, 'random', nb_games=250, workers=2, chunk_size=40)
+
+    assert stats.games == 250
+    assert sum(stats.tries_histogram) == stats.wins
+    assert elapsed > 0
@@ -0,0 +1,177 @@
+from mastermind.codec import CodeCodec
+from mastermind.config import valid_codes
+from mastermind import solver
+from mastermind.mastermind_core import MastermindCore
+from mastermind.solver import SearchCancelledError
+from mastermind.solver import Solver
+from mastermind.solver import UnknownStrategyError
+
+import threading
+
+import pytest
+
+
+def test_valid_codes():
+    """ Validating the list of codes with and without duplicates
+    """
+    codec = CodeCodec(['Red', 'Green', 'Blue', 'Yellow'], 3)
+
+    assert len(valid_codes(codec, allow_duplicates=True)) == 64
+    codes = valid_codes(codec, allow_duplicates=False)
+    assert len(codes) == 24
+    assert not any(codec.has_duplicates(int(x)) for x in codes)
+
+
+@pytest.mark.parametrize('strategy', ['minimax', 'expected_size', 'entropy'])
+def test_solve_all_secrets(strategy):
+    """ Validating that the solver finds every secret code
+    """
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 3,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow']
+    )
+    solver = Solver(mastermind, strategy, use_score_table=False)
+
+    for secret in range(mastermind.codec.size):
+        mastermind.reset_game()
+        mastermind.secret_code = mastermind.codec.decode(secret)
+        solver.reset()
+
+        assert solver.play() == True
+        assert mastermind.nb_player_guesses <= 5
+
+
+def test_solve_without_duplicates():
+    """ Validating that the solver only plays codes without duplicates when
+        they are not allowed.
+    """
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 3,
+        allow_duplicates = False,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow', 'White']
+    )
+    mastermind.reset_game()
+    solver = Solver(mastermind, use_score_table=False)
+
+    assert solver.play() == True
+    for guess in mastermind.player_guesses:
+        assert len(set(guess['guess'])) == 3
+
+
+def test_incremental_pruning():
+    """ Validating that the candidates are pruned with the guesses added to
+        the game, whoever plays them.
+    """
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 4,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow']
+    )
+    mastermind.reset_game()
+    mastermind.secret_code = ['Green', 'Red', 'Blue', 'Blue']
+    solver = Solver(mastermind, use_score_table=False)
+    assert solver.nb_candidates == 256
+
+    mastermind.add_guess(['Red', 'Green', 'Blue', 'Yellow'])
+    candidates = solver.candidates
+    assert mastermind.codec.encode(mastermind.secret_code) in candidates
+    for code in candidates:
+        digits = mastermind.codec.digits(int(code))
+        guess = mastermind.codec.digits(mastermind.codec.encode(['Red', 'Green', 'Blue', 'Yellow']))
+        assert mastermind.codec.score(guess, digits) == (1, 2)
+
+    # A new game restarts from the full set of codes
+    mastermind.reset_game()
+    assert solver.nb_candidates == 256
+
+
+def test_max_tries():
+    """ Validating that the solver stops when the maximum number of tries is
+        reached.
+    """
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 4,
+        max_tries = 2,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow', 'White', 'Black']
+    )
+    mastermind.reset_game()
+    mastermind.secret_code = ['Black', 'White', 'Yellow', 'Blue']
+    solver = Solver(mastermind, use_score_table=False)
+
+    assert solver.play() == False
+    assert mastermind.nb_player_guesses == 2
+
+
+def test_cancelled_search():
+    """ Validating that setting the cancellation event stops the search
+    """
+    mastermind = MastermindCore()
+    mastermind.configure(
+        code_length = 4,
+        colours_set = ['Red', 'Green', 'Blue', 'Yellow', 'White', 'Black']
+    )
+    mastermind.reset_game()
+    mastermind.add_guess(['Red', 'Red', 'Green', 'Blue'])
+    cancel_event = threading.Event()
+    solver = Solver(mastermind, use_score_table=False, cancel_event=cancel_event)
+    expected = Solver(mastermind, use_score_table=False).next_guess()
+
+    cancel_event.set()
+    with pytest.raises(SearchCancelledError):
+        solver.next_guess()
+    cancel_event.clear()
+    assert solver.next_guess() == expected
+
+
+def test_unknown_strategy():
+    """ Validating that unknown strategies are refused
+    """
+    with pytest.raises(UnknownStrategyError):
+        Solver(MastermindCore(), 'random')
+
+
+@pytest.mark.parametrize('allow_duplicates', [True, False])
+def test_unlisted_codes(monkeypatch, allow_duplicates):
+    """ Validating that the solver plays the same games when the codes of the
+        configuration are not listed.
+    """
+    def play_games():
+        mastermind = MastermindCore(quiet=True, seed=6)
+        mastermind.configure(code_length=4, allow_duplicates=allow_duplicates,
+                             colours_set=['A', 'B', 'C', 'D', 'E', 'F', 'G'])
+        player = Solver(mastermind, use_score_table=False)
+        games = []
+        for secret in mastermind.generate_secret_codes(10):
+            mastermind.reset_game(int(secret))
+            player.reset()
+            player.play()
+            games.append(mastermind.player_guesses)
+        return games
+
+    monkeypatch.setattr(solver, '_first_guesses', {})
+    listed = play_games()
+    # The codes are sampled for the first guess, then listed by the search
+    monkeypatch.setattr(solver, '_first_guesses', {})
+    monkeypatch.setattr(solver, 'MAX_LISTED_CODES', 0)
+    assert play_games() == listed
+
+
+def test_large_configuration():
+    """ Validating that the solver plays in a configuration too large to list
+        its codes.
+    """
+    mastermind = MastermindCore(quiet=True, seed=7)
+    mastermind.configure(code_length=8, max_tries=20, colours_set=[f'Colour{x}' for x in range(12)])
+    mastermind.reset_game()
+    player = Solver(mastermind)
+    assert player.nb_candidates == 12 ** 8
+
+    for _ in range(2):
+        mastermind.add_guess(player.hint())
+    assert player.nb_candidates == mastermind.count_consistent_codes()
+    assert mastermind.config.score_table is None
+    # The codes of the configuration are never listed
+    assert mastermind.config._valid_codes is None
@@ -0,0 +1,49 @@
+from mastermind.codec import CodeCodec
+from mastermind.config import valid_codes
+from mastermind.symmetry import canonical_guesses
+from mastermind.symmetry import canonical_mask
+from mastermind.symmetry import colour_classes
+from mastermind.symmetry import first_guesses
+
+import numpy as np
+import pytest
+
+
+def test_first_guesses():
+    """ Validating that the first guesses are reduced to the colour counts
+        of the pegs.
+    """
+    codec = CodeCodec(['A', 'B', 'C', 'D', 'E', 'F'], 4)
+    guesses = [''.join(codec.decode(x)) for x in first_guesses(codec)]
+    assert guesses == ['AAAA', 'AAAB', 'AABB', 'AABC', 'ABCD']
+    assert [''.join(codec.decode(x)) for x in first_guesses(codec, allow_duplicates=False)] == ['ABCD']
+
+
+def test_colour_classes():
+    """ Validating that the colours not played yet are grouped together.
+    """
+    codec = CodeCodec(['A', 'B', 'C', 'D', 'E', 'F'], 4)
+    guesses = [codec.encode(['B', 'B', 'D', 'D'])]
+    assert colour_classes(codec, guesses) == [(1,), (3,), (0, 2, 4, 5)]
+    assert colour_classes(codec, []) == [(0, 1, 2, 3, 4, 5)]
+
+
+@pytest.mark.parametrize('allow_duplicates', [True, False])
+def test_canonical_guesses(allow_duplicates):
+    """ Validating that the enumerated guesses match the representatives
+        selected among all the codes, and are the lowest codes of their class.
+    """
+    codec = CodeCodec(['A', 'B', 'C', 'D', 'E', 'F'], 4)
+    codes = valid_codes(codec, allow_duplicates)
+
+    for played in ([], ['A', 'B', 'C', 'D'], ['C', 'C', 'E', 'E']):
+        guesses = [codec.encode(played)] if played else []
+        enumerated = list(canonical_guesses(codec, guesses, allow_duplicates))
+        selected = codes[canonical_mask(codec, codes, guesses)]
+        assert enumerated == selected.tolist()
+        assert enumerated == sorted(enumerated)
+
+    # With C and E played, A, B, D and F are equivalent
+    guesses = [codec.encode(['C', 'C', 'E', 'E'])]
+    mask = canonical_mask(codec, np.array([codec.encode(x) for x in ('CEAB', 'CEBA', 'CEAA', 'CEBB')]), guesses)
+    assert mask.tolist() == [True, False, True, False]